@@ -0,0 +1,103 @@
+import os
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from starlette import status
+
+MAX_BATCH_OPERATIONS = int(os.getenv("MAX_BATCH_OPERATIONS", "500"))
+
+
+def check_batch_size(batch_request):
+    total = sum(
+        len(getattr(batch_request, operation, []))
+        for operation in ("create", "update", "delete")
+    )
+    if total > MAX_BATCH_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can contain at most {MAX_BATCH_OPERATIONS} operations",
+        )
+
+
+async def existing_rows(db, model, ids, *criteria) -> dict:
+    if not ids:
+        return {}
+    columns = [model.id]
+    version_column = model.__mapper__.version_id_col
+    if version_column is not None:
+        columns.append(version_column)
+    statement = select(*columns).where(model.id.in_(set(ids)), *criteria)
+    return {
+        row.id: row[1] if version_column is not None else None
+        for row in await db.execute(statement)
+    }
+
+
+async def apply_batch(
+    db,
+    model,
+    creates: list[dict],
+    updates: list[dict],
+    deletes: list,
+    existing: dict,
+) -> list[dict]:
+    results = []
+
+    create_values = []
+    for index, values in enumerate(creates):
+        values = {"id": uuid.uuid4(), **values}
+        create_values.append(values)
+        results.append(
+            {
+                "op": "create",
+                "index": index,
+                "id": values["id"],
+                "status": status.HTTP_201_CREATED,
+            }
+        )
+    if create_values:
+        await db.execute(insert(model), create_values)
+
+    version_key = (
+        model.__mapper__.version_id_col.key
+        if model.__mapper__.version_id_col is not None
+        else None
+    )
+    groups = {}
+    for values in updates:
+        if values["id"] not in existing:
+            results.append(
+                {
+                    "op": "update",
+                    "id": values["id"],
+                    "status": status.HTTP_404_NOT_FOUND,
+                }
+            )
+            continue
+        if version_key is not None:
+            values = {**values, version_key: existing[values["id"]]}
+        groups.setdefault(frozenset(values), []).append(values)
+        results.append(
+            {"op": "update", "id": values["id"], "status": status.HTTP_204_NO_CONTENT}
+        )
+    for group in groups.values():
+        await db.execute(update(model), group)
+
+    delete_ids = [property_id for property_id in deletes if property_id in existing]
+    results.extend(
+        {
+            "op": "delete",
+            "id": item_id,
+            "status": (
+                status.HTTP_204_NO_CONTENT
+                if item_id in existing
+                else status.HTTP_404_NOT_FOUND
+            ),
+        }
+        for item_id in deletes
+    )
+    if delete_ids:
+        await db.execute(delete(model).where(model.id.in_(delete_ids)))
+
+    return results
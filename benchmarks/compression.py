@@ -0,0 +1,84 @@
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+LEVELS = {
+    "gzip": [1, 4, 6, 9],
+    "br": [1, 4, 6, 9, 11],
+    "zstd": [1, 3, 6, 12, 19],
+}
+
+
+def build_payloads(page_size: int, stream_size: int) -> dict:
+    import responses
+    from benchmarks.seed import generate_properties, new_id
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    addresses = [(new_id(rng), f"Ciudad {index}") for index in range(50)]
+    agent_ids = [new_id(rng) for _ in range(20)]
+    rows = list(
+        generate_properties(rng, max(page_size, stream_size), addresses, agent_ids, now)
+    )
+    page = responses.dumps(
+        {"items": rows[:page_size], "next_cursor": "eyJpZCI6ICIxMjMifQ"}
+    )
+    return {
+        f"page ({page_size})": [page],
+        f"ndjson ({stream_size} chunks)": [
+            responses.dumps(row) + b"\n" for row in rows[:stream_size]
+        ],
+    }
+
+
+def measure(encoding: str, level: int, chunks: list, repeats: int) -> dict:
+    from http_compression import COMPRESSORS
+
+    elapsed = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        compressor = COMPRESSORS[encoding](level)
+        body = b"".join(
+            compressor.compress(chunk, flush=len(chunks) > 1) for chunk in chunks
+        )
+        body += compressor.finish()
+        elapsed += time.perf_counter() - start
+    return {"seconds": elapsed / repeats, "bytes": len(body)}
+
+
+def run(args):
+    from http_compression import available_encodings
+
+    encodings = available_encodings(list(LEVELS))
+    for name, chunks in build_payloads(args.page_size, args.stream_size).items():
+        size = sum(len(chunk) for chunk in chunks)
+        print(f"\n{name}: {size} bytes")
+        print(
+            f"{'encoding':>8} {'level':>5} {'time':>10} {'MB/s':>8} "
+            f"{'bytes':>9} {'ratio':>6} {'saved':>6} {'saved/ms':>9}"
+        )
+        for encoding in encodings:
+            for level in LEVELS[encoding]:
+                result = measure(encoding, level, chunks, args.repeats)
+                milliseconds = result["seconds"] * 1000
+                saved = size - result["bytes"]
+                print(
+                    f"{encoding:>8} {level:>5} {milliseconds:>8.2f}ms "
+                    f"{size / result['seconds'] / 1e6:>8.1f} {result['bytes']:>9} "
+                    f"{size / result['bytes']:>6.1f} {saved / size:>6.1%} "
+                    f"{saved / milliseconds:>9.0f}"
+                )
+    missing = sorted(set(LEVELS) - set(encodings))
+    if missing:
+        print(f"\nSkipped (not installed): {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare CPU cost and bytes saved for each response encoding"
+    )
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--stream-size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    run(parser.parse_args())
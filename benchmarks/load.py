@@ -0,0 +1,409 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+BULK_UPDATE_SIZE = 50
+SAMPLE_SIZE = 5000
+SEARCH_TERMS = ["jardin", "vista", "moderno", "playa", "centro", "seguridad"]
+
+SCENARIOS = {}
+
+
+def scenario(name: str):
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+
+    return register
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+@scenario("browse")
+async def browse(client, context, state, rng):
+    if state.get("cursor") is None or state["pages"] >= 10:
+        state.update(
+            cursor=None,
+            pages=0,
+            sort=rng.choice(["id", "price", "size"]),
+            order=rng.choice(["asc", "desc"]),
+        )
+    params = {"limit": 20, "sort": state["sort"], "order": state["order"]}
+    if state["cursor"]:
+        params["cursor"] = state["cursor"]
+    response = await client.get("/properties/", params=params)
+    if response.status_code == 200:
+        state["cursor"] = response.json()["next_cursor"]
+        state["pages"] += 1
+    return response
+
+
+@scenario("search")
+async def search(client, context, state, rng):
+    params = {"limit": 20}
+    if rng.random() < 0.5:
+        params["q"] = rng.choice(SEARCH_TERMS)
+    else:
+        params.update(
+            status=rng.choice(["for sale", "for rent"]),
+            type=rng.choice(["house", "apartment"]),
+            max_price=rng.choice([2_000_000, 5_000_000, 10_000_000]),
+            min_bedrooms=rng.randint(1, 4),
+        )
+    return await client.get("/properties/search", params=params)
+
+
+@scenario("detail")
+async def detail(client, context, state, rng):
+    property_id = rng.choice(context["property_ids"])
+    if rng.random() < 0.5:
+        return await client.get(f"/properties/{property_id}")
+    return await client.get(f"/properties/{property_id}/full")
+
+
+@scenario("login")
+async def login(client, context, state, rng):
+    return await client.post(
+        "/auth/token",
+        data={
+            "username": f"bench{rng.randrange(context['agents'])}",
+            "password": context["password"],
+        },
+    )
+
+
+@scenario("bulk_update")
+async def bulk_update(client, context, state, rng):
+    if "headers" not in state:
+        agent = state["worker"] % context["agents"]
+        while True:
+            response = await client.post(
+                "/auth/token",
+                data={"username": f"bench{agent}", "password": context["password"]},
+            )
+            if response.status_code != 503:
+                break
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        state["headers"] = {"Authorization": f"Bearer {token}"}
+        state["property_ids"] = context["owned"][agent]
+    property_ids = rng.sample(
+        state["property_ids"], min(BULK_UPDATE_SIZE, len(state["property_ids"]))
+    )
+    return await client.post(
+        "/properties/batch",
+        json={
+            "update": [
+                {"id": property_id, "price": round(rng.uniform(5e5, 5e6), -3)}
+                for property_id in property_ids
+            ]
+        },
+        headers=state["headers"],
+    )
+
+
+def load_context(concurrency: int) -> dict:
+    from sqlalchemy import func, select
+
+    from benchmarks.seed import BENCH_PASSWORD
+    from config import RoleUser
+    from database import engine
+    from models import Agents, Properties
+
+    with engine.connect() as connection:
+        property_ids = [
+            str(property_id)
+            for property_id in connection.scalars(
+                select(Properties.id).order_by(func.random()).limit(SAMPLE_SIZE)
+            )
+        ]
+        agents = connection.scalar(
+            select(func.count()).where(
+                Agents.username.like("bench%"), Agents.role == RoleUser.AGENT
+            )
+        )
+        owned = {}
+        for index in range(min(concurrency, agents)):
+            owned[index] = [
+                str(property_id)
+                for property_id in connection.scalars(
+                    select(Properties.id)
+                    .join(Agents, Agents.id == Properties.agent_id)
+                    .where(Agents.username == f"bench{index}")
+                    .limit(SAMPLE_SIZE)
+                )
+            ]
+    return {
+        "property_ids": property_ids,
+        "agents": agents,
+        "owned": owned,
+        "password": BENCH_PASSWORD,
+    }
+
+
+async def run_scenario(client, name, context, requests, concurrency, warmup, seed):
+    operation = SCENARIOS[name]
+    latencies, statuses = [], []
+    remaining = [warmup + requests]
+
+    async def worker(index: int):
+        rng = random.Random(seed * 1000 + index)
+        state = {"worker": index}
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            measured = remaining[0] < requests
+            start = time.perf_counter()
+            response = await operation(client, context, state, rng)
+            if measured:
+                latencies.append(time.perf_counter() - start)
+                statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for status_code in statuses if status_code >= 400),
+        "statuses": {
+            str(status_code): statuses.count(status_code)
+            for status_code in sorted(set(statuses))
+        },
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def wait_until_ready(client, process, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited before becoming ready")
+        try:
+            if (await client.get("/health/")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready")
+
+
+async def run(args) -> dict:
+    import httpx
+
+    context = load_context(args.concurrency)
+    results = {}
+    if args.target == "inprocess":
+        from main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client,
+                    name,
+                    context,
+                    args.requests,
+                    args.concurrency,
+                    args.warmup,
+                    args.seed,
+                )
+        return results
+
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+        ) as client:
+            await wait_until_ready(client, process)
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client,
+                    name,
+                    context,
+                    args.requests,
+                    args.concurrency,
+                    args.warmup,
+                    args.seed,
+                )
+    finally:
+        process.terminate()
+        process.wait()
+    return results
+
+
+def prepare_database(args) -> str:
+    database = args.database or os.path.join(
+        tempfile.gettempdir(), f"estatehub-bench-{args.properties}.db"
+    )
+    if args.reseed and os.path.exists(database):
+        os.remove(database)
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{database}",
+        SECRET_KEY=os.getenv("SECRET_KEY", "bench-secret"),
+        ALGORITHM=os.getenv("ALGORITHM", "HS256"),
+        JOB_APP_WORKERS="0",
+        STATS_REBUILD_INTERVAL="0",
+        RATE_LIMIT_ENABLED="false",
+        CHANGES_PRUNE_INTERVAL="0",
+        DB_SLOW_QUERY_MS=os.getenv("DB_SLOW_QUERY_MS", "10000"),
+    )
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    if not os.path.exists(database):
+        print(f"Seeding {args.properties} properties into {database}")
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.seed",
+                "--properties",
+                str(args.properties),
+                "--seed",
+                str(args.seed),
+            ],
+            env=os.environ.copy(),
+            check=True,
+        )
+    return database
+
+
+def print_results(results: dict, baseline: dict | None):
+    print(
+        f"{'scenario':>12} {'req/s':>9} {'errors':>7} {'p50':>9} {'p95':>9} "
+        f"{'p99':>9} {'max':>9}" + (f" {'p95 vs base':>12}" if baseline else "")
+    )
+    for name, result in results.items():
+        line = (
+            f"{name:>12} {result['requests_per_second']:>9} {result['errors']:>7} "
+            f"{result['p50_ms']:>7}ms {result['p95_ms']:>7}ms "
+            f"{result['p99_ms']:>7}ms {result['max_ms']:>7}ms"
+        )
+        if baseline and name in baseline["results"]:
+            before = baseline["results"][name]["p95_ms"]
+            line += f" {(result['p95_ms'] - before) / before * 100:>+11.1f}%"
+        print(line)
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["requests_per_second"] < before["requests_per_second"] * (
+            1 - tolerance
+        ):
+            found.append(
+                f"{name}: throughput {before['requests_per_second']} -> "
+                f"{result['requests_per_second']} req/s"
+            )
+    return found
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Drive the API with scripted scenarios against a seeded database"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--target", choices=["inprocess", "uvicorn"], default="inprocess"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("--database", help="SQLite file, seeded when missing")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", metavar="NAME", help="Save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    prepare_database(args)
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(baseline_path(args.compare)) as baseline_file:
+            baseline = json.load(baseline_file)
+    if baseline and baseline["target"] != args.target:
+        print(
+            f"Note: baseline {args.compare} was recorded against {baseline['target']}"
+        )
+    print_results(results, baseline)
+
+    if args.save:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        with open(baseline_path(args.save), "w") as baseline_file:
+            json.dump(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "target": args.target,
+                    "workers": args.workers,
+                    "properties": args.properties,
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                    "results": results,
+                },
+                baseline_file,
+                indent=2,
+            )
+        print(f"Saved baseline {baseline_path(args.save)}")
+    if baseline:
+        found = regressions(results, baseline, args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        if found:
+            sys.exit(1)
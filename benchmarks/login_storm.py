@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run_storm(logins: int, concurrency: int):
+    import httpx
+
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await client.post(
+            "/auth/",
+            json={
+                "name": "bench",
+                "email": "bench@example.com",
+                "username": "bench",
+                "password": "bench-password",
+                "phone": "0",
+                "role": "agent",
+            },
+        )
+
+        done = asyncio.Event()
+        read_latencies = []
+        statuses = []
+
+        async def login_worker(count: int):
+            for _ in range(count):
+                response = await client.post(
+                    "/auth/token",
+                    data={"username": "bench", "password": "bench-password"},
+                )
+                statuses.append(response.status_code)
+
+        async def reader():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/properties/", params={"limit": 20})
+                read_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.005)
+
+        reader_task = asyncio.create_task(reader())
+        per_worker = max(1, logins // concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker(per_worker) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await reader_task
+
+    return {
+        "workers": int(os.environ["PASSWORD_HASH_WORKERS"]),
+        "logins": len(statuses),
+        "rejected": statuses.count(503),
+        "logins_per_second": round(len(statuses) / elapsed, 2),
+        "read_p50_ms": round(statistics.median(read_latencies) * 1000, 2),
+        "read_p99_ms": round(percentile(read_latencies, 99) * 1000, 2),
+    }
+
+
+def run_child(args):
+    result = asyncio.run(run_storm(args.logins, args.concurrency))
+    print(json.dumps(result))
+
+
+def run_parent(args):
+    print(
+        f"{'workers':>8} {'logins/s':>10} {'503s':>6} {'read p50':>10} {'read p99':>10}"
+    )
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{directory}/bench.db",
+                SECRET_KEY=os.getenv("SECRET_KEY", "bench-secret"),
+                ALGORITHM=os.getenv("ALGORITHM", "HS256"),
+                PASSWORD_HASH_WORKERS=str(workers),
+            )
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.login_storm",
+                    "--child",
+                    "--logins",
+                    str(args.logins),
+                    "--concurrency",
+                    str(args.concurrency),
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f"{result['workers']:>8} {result['logins_per_second']:>10} "
+            f"{result['rejected']:>6} {result['read_p50_ms']:>8}ms "
+            f"{result['read_p99_ms']:>8}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Login storm: bcrypt throughput vs. read latency"
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+    else:
+        run_parent(args)
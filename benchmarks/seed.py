@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+BENCH_PASSWORD = "bench-password"
+CHUNK_SIZE = 10_000
+
+STATES = [
+    "Aguascalientes",
+    "Baja California",
+    "Baja California Sur",
+    "Campeche",
+    "Chiapas",
+    "Chihuahua",
+    "Ciudad de Mexico",
+    "Coahuila",
+    "Colima",
+    "Durango",
+    "Guanajuato",
+    "Guerrero",
+    "Hidalgo",
+    "Jalisco",
+    "Mexico",
+    "Michoacan",
+    "Morelos",
+    "Nayarit",
+    "Nuevo Leon",
+    "Oaxaca",
+    "Puebla",
+    "Queretaro",
+    "Quintana Roo",
+    "San Luis Potosi",
+    "Sinaloa",
+    "Sonora",
+    "Tabasco",
+    "Tamaulipas",
+    "Tlaxcala",
+    "Veracruz",
+    "Yucatan",
+    "Zacatecas",
+]
+OPTIONS = [
+    "Alberca",
+    "Jardin",
+    "Cochera",
+    "Terraza",
+    "Gimnasio",
+    "Seguridad",
+    "Elevador",
+    "Amueblado",
+    "Mascotas",
+    "Vista al mar",
+    "Cuarto de servicio",
+    "Bodega",
+    "Aire acondicionado",
+    "Calefaccion",
+    "Roof garden",
+    "Area de juegos",
+]
+STREETS = ["Av. Juarez", "Calle Hidalgo", "Av. Reforma", "Calle Morelos", "Blvd. Lopez"]
+ADJECTIVES = ["amplia", "moderna", "remodelada", "iluminada", "centrica", "tranquila"]
+WORDS = (
+    "casa departamento terreno local oficina jardin cocina recamara bano sala "
+    "comedor estacionamiento vista luminoso amplio moderno excelente ubicacion "
+    "cerca escuelas parques transporte seguridad privada acabados lujo nueva "
+    "remodelada centro playa montana colonia fraccionamiento"
+).split()
+PRICE_RANGES = {
+    "house": (900_000, 12_000_000),
+    "apartment": (600_000, 8_000_000),
+    "land": (200_000, 5_000_000),
+    "local": (400_000, 6_000_000),
+    "commercial": (1_000_000, 30_000_000),
+    "other": (100_000, 3_000_000),
+}
+
+
+def new_id(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def chunks(rows, size: int = CHUNK_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_properties(rng, count, addresses, agent_ids, now):
+    from config import PropertiesStatus, PropertiesType
+    from geo import encode_geohash
+
+    types = list(PropertiesType)
+    statuses = list(PropertiesStatus)
+    for index in range(count):
+        property_type = rng.choice(types)
+        low, high = PRICE_RANGES[property_type.value]
+        address_id, city = addresses[index % len(addresses)]
+        latitude = round(rng.uniform(14.5, 32.5), 6)
+        longitude = round(rng.uniform(-117.0, -86.7), 6)
+        yield {
+            "id": new_id(rng),
+            "address_id": address_id,
+            "type": property_type,
+            "price": round(rng.uniform(low, high), -3),
+            "status": rng.choice(statuses),
+            "agent_id": agent_ids[index % len(agent_ids)],
+            "title": f"{property_type.value.title()} {rng.choice(ADJECTIVES)} en {city}",
+            "subtitle": " ".join(rng.choices(WORDS, k=6)),
+            "size": round(rng.uniform(40, 1200), 1),
+            "bedrooms": rng.randint(0, 6),
+            "rooms": rng.randint(1, 12),
+            "bathrooms": rng.randint(1, 5),
+            "description": " ".join(rng.choices(WORDS, k=40)),
+            "map": f"{latitude},{longitude}",
+            "latitude": latitude,
+            "longitude": longitude,
+            "geohash": encode_geohash(latitude, longitude),
+            "version": 1,
+            "updated_at": now,
+        }
+
+
+def seed(
+    properties: int,
+    agents: int,
+    cities_per_state: int,
+    images_per_property: int,
+    options_per_property: int,
+    seed_value: int = 42,
+) -> dict:
+    from sqlalchemy import insert
+
+    import models
+    from config import ImageStatus, RoleUser
+    from database import engine
+    from fulltext import setup_fulltext
+    from passwords import bcrypt_context
+
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+    models.Base.metadata.create_all(bind=engine)
+    counts = {}
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            connection.exec_driver_sql("PRAGMA synchronous=OFF")
+
+        def load(model, rows):
+            total = 0
+            for batch in chunks(rows):
+                connection.execute(insert(model.__table__), batch)
+                total += len(batch)
+            counts[model.__tablename__] = total
+
+        states = [(new_id(rng), name) for name in STATES]
+        load(
+            models.States,
+            ({"id": state_id, "state": name} for state_id, name in states),
+        )
+        cities = [
+            (new_id(rng), state_id, f"{name} {number + 1}")
+            for state_id, name in states
+            for number in range(cities_per_state)
+        ]
+        load(
+            models.Cities,
+            (
+                {"id": city_id, "state_id": state_id, "city": name}
+                for city_id, state_id, name in cities
+            ),
+        )
+
+        addresses = []
+        address_rows = []
+        for _ in range(properties):
+            city_id, state_id, city = rng.choice(cities)
+            address_id = new_id(rng)
+            addresses.append((address_id, city))
+            address_rows.append(
+                {
+                    "id": address_id,
+                    "state_id": state_id,
+                    "city_id": city_id,
+                    "address": f"{rng.choice(STREETS)} {rng.randint(1, 9999)}",
+                }
+            )
+        load(models.Addresses, address_rows)
+        del address_rows
+
+        hashed_password = bcrypt_context.hash(BENCH_PASSWORD)
+        agent_ids = [new_id(rng) for _ in range(agents)]
+        agent_rows = [
+            {
+                "id": agent_id,
+                "name": f"Bench Agent {index}",
+                "email": f"bench{index}@example.com",
+                "username": f"bench{index}",
+                "hashed_password": hashed_password,
+                "phone": f"55{index:08d}",
+                "role": RoleUser.AGENT,
+            }
+            for index, agent_id in enumerate(agent_ids)
+        ]
+        agent_rows.append(
+            {
+                "id": new_id(rng),
+                "name": "Bench Admin",
+                "email": "bench-admin@example.com",
+                "username": "bench-admin",
+                "hashed_password": hashed_password,
+                "phone": "5500000000",
+                "role": RoleUser.ADMIN,
+            }
+        )
+        load(models.Agents, agent_rows)
+
+        option_ids = [new_id(rng) for _ in OPTIONS]
+        load(
+            models.PropertieOptions,
+            (
+                {"id": option_id, "name": name}
+                for option_id, name in zip(option_ids, OPTIONS)
+            ),
+        )
+
+        property_ids = []
+
+        def tracked(rows):
+            for row in rows:
+                property_ids.append(row["id"])
+                yield row
+
+        load(
+            models.Properties,
+            tracked(generate_properties(rng, properties, addresses, agent_ids, now)),
+        )
+        load(
+            models.PropertieAssignedOptions,
+            (
+                {
+                    "id": new_id(rng),
+                    "property_id": property_id,
+                    "property_option_id": option_id,
+                }
+                for property_id in property_ids
+                for option_id in rng.sample(option_ids, options_per_property)
+            ),
+        )
+        load(
+            models.PropertieImages,
+            (
+                {
+                    "id": new_id(rng),
+                    "property_id": property_id,
+                    "image_url": f"/media/seed/{property_id}/{number}.jpg",
+                    "thumbnail_url": f"/media/seed/{property_id}/{number}-thumb.webp",
+                    "is_thimbnail": number == 0,
+                    "status": ImageStatus.LISTA,
+                    "width": 1600,
+                    "height": 1200,
+                }
+                for property_id in property_ids
+                for number in range(images_per_property)
+            ),
+        )
+
+    setup_fulltext(engine)
+    counts["property_stats"] = asyncio.run(rebuild_stats())
+    return counts
+
+
+async def rebuild_stats() -> int:
+    import stats
+    from database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await stats.rebuild(db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed DATABASE_URL with realistic volumes for benchmarking"
+    )
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--cities-per-state", type=int, default=25)
+    parser.add_argument("--images-per-property", type=int, default=3)
+    parser.add_argument("--options-per-property", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    logging.getLogger("db_metrics").setLevel(logging.ERROR)
+    start = time.perf_counter()
+    counts = seed(
+        args.properties,
+        args.agents,
+        args.cities_per_state,
+        args.images_per_property,
+        args.options_per_property,
+        args.seed,
+    )
+    print(json.dumps(counts, indent=2))
+    print(f"Elapsed: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+async def measure(page_size: int, repeats: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    import pagination
+    import responses
+    from database import AsyncSessionLocal
+    from models import Properties
+    from schemas import Page, PropertyResponse
+
+    columns = pagination.response_columns(Properties, PropertyResponse)
+    projected = pagination.field_columns(
+        Properties, pagination.parse_fields("title,price,status", PropertyResponse)
+    )
+    adapter = TypeAdapter(Page[PropertyResponse])
+
+    async def orm_page(db):
+        return await pagination.paginate(db, Properties, page_size)
+
+    async def rows_page(db):
+        return await pagination.paginate_rows(db, Properties, columns, page_size)
+
+    async def projected_page(db):
+        return await pagination.paginate_rows(db, Properties, projected, page_size)
+
+    def encoder_dump(page):
+        return json.dumps(
+            jsonable_encoder(page),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode()
+
+    def model_dump(page):
+        return adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+    strategies = {
+        "orm + jsonable_encoder": (orm_page, encoder_dump),
+        "orm + response model": (orm_page, model_dump),
+        "rows + orjson": (rows_page, responses.dumps),
+        "fields + orjson": (projected_page, responses.dumps),
+    }
+    results = {}
+    for name, (fetch, dump) in strategies.items():
+        fetch_time = dump_time = 0.0
+        for _ in range(repeats):
+            async with AsyncSessionLocal() as db:
+                start = time.perf_counter()
+                page = await fetch(db)
+                fetched = time.perf_counter()
+                body = dump(page)
+                dump_time += time.perf_counter() - fetched
+                fetch_time += fetched - start
+        results[name] = {
+            "fetch_ms": round(fetch_time / repeats * 1000, 2),
+            "serialize_ms": round(dump_time / repeats * 1000, 2),
+            "bytes": len(body),
+        }
+    return results
+
+
+def run_parent(args):
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{directory}/bench.db",
+            SECRET_KEY=os.getenv("SECRET_KEY", "bench-secret"),
+            ALGORITHM=os.getenv("ALGORITHM", "HS256"),
+            DB_SLOW_QUERY_MS="10000",
+        )
+        env.pop("ASYNC_DATABASE_URL", None)
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.serialization",
+                "--child",
+                "--page-size",
+                str(args.page_size),
+                "--repeats",
+                str(args.repeats),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    results = json.loads(output.stdout.strip().splitlines()[-1])
+    baseline = results["orm + jsonable_encoder"]
+    print(
+        f"{'strategy':>24} {'fetch':>10} {'serialize':>11} {'total':>10} "
+        f"{'serialize x':>12} {'total x':>8} {'bytes':>9}"
+    )
+    for name, result in results.items():
+        total = result["fetch_ms"] + result["serialize_ms"]
+        baseline_total = baseline["fetch_ms"] + baseline["serialize_ms"]
+        print(
+            f"{name:>24} {result['fetch_ms']:>8}ms {result['serialize_ms']:>9}ms "
+            f"{total:>8.2f}ms "
+            f"{baseline['serialize_ms'] / result['serialize_ms']:>11.1f}x "
+            f"{baseline_total / total:>7.1f}x {result['bytes']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fetch and serialize one page of properties with each strategy"
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        from benchmarks.seed import seed
+
+        seed(args.page_size, 10, 2, 1, 1)
+        print(json.dumps(asyncio.run(measure(args.page_size, args.repeats))))
+    else:
+        run_parent(args)
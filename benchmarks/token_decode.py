@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+
+def write_key(directory: str, algorithm: str) -> str:
+    if algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(os.path.join(directory, "bench.pem"), "wb") as key_file:
+        key_file.write(
+            private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return directory
+
+
+def measure(decodes: int, distinct_tokens: int):
+    import tokens
+
+    issued = [
+        tokens.create_access_token(
+            {"sub": f"bench{index}", "id": str(index), "role": "agent"}
+        )
+        for index in range(distinct_tokens)
+    ]
+    results = {"algorithm": tokens.keys[tokens.active_kid].algorithm}
+    for label, use_cache in (("uncached", False), ("cached", True)):
+        tokens.verified_claims.entries.clear()
+        start = time.perf_counter()
+        for index in range(decodes):
+            tokens.decode_access_token(issued[index % distinct_tokens], use_cache)
+        elapsed = time.perf_counter() - start
+        results[f"{label}_per_second"] = round(decodes / elapsed)
+        results[f"{label}_us"] = round(elapsed / decodes * 1_000_000, 2)
+    return results
+
+
+def run_parent(args):
+    print(
+        f"{'algorithm':>10} {'uncached/s':>12} {'cached/s':>12} "
+        f"{'uncached':>10} {'cached':>10}"
+    )
+    for algorithm in args.algorithms:
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, SECRET_KEY="bench-secret", ALGORITHM="HS256")
+            env.pop("JWT_ACTIVE_KID", None)
+            env.pop("JWT_KEYS_DIR", None)
+            if algorithm != "HS256":
+                env["JWT_KEYS_DIR"] = write_key(directory, algorithm)
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.token_decode",
+                    "--child",
+                    "--decodes",
+                    str(args.decodes),
+                    "--tokens",
+                    str(args.tokens),
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f"{result['algorithm']:>10} {result['uncached_per_second']:>12} "
+            f"{result['cached_per_second']:>12} {result['uncached_us']:>8}us "
+            f"{result['cached_us']:>8}us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Access token verification throughput with and without the "
+        "verified-claims cache"
+    )
+    parser.add_argument(
+        "--algorithms",
+        nargs="+",
+        default=["HS256", "ES256", "RS256"],
+        choices=["HS256", "ES256", "RS256"],
+    )
+    parser.add_argument("--decodes", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.decodes, args.tokens)))
+    else:
+        run_parent(args)
@@ -0,0 +1,138 @@
+import os
+import shutil
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BLOB_STORE = os.getenv("BLOB_STORE", "local")
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "media")
+BLOB_BASE_URL = os.getenv("BLOB_BASE_URL", "/media")
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+
+
+class LocalBlobStore:
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def put_file(self, key: str, path: str, content_type: str):
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.partial")
+        shutil.copyfile(path, partial)
+        os.replace(partial, target)
+
+    def put_bytes(self, key: str, data: bytes, content_type: str):
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.partial")
+        partial.write_bytes(data)
+        os.replace(partial, target)
+
+    def get_bytes(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def touch(self, key: str, content_type: str):
+        os.utime(self.root / key)
+
+    def modified_at(self, key: str) -> float | None:
+        try:
+            return (self.root / key).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str):
+        (self.root / key).unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3BlobStore:
+    def __init__(self, client, bucket: str, base_url: str):
+        self.client = client
+        self.bucket = bucket
+        self.base_url = base_url.rstrip("/")
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def put_file(self, key: str, path: str, content_type: str):
+        self.client.upload_file(
+            path,
+            self.bucket,
+            key,
+            ExtraArgs={
+                "ContentType": content_type,
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+        )
+
+    def put_bytes(self, key: str, data: bytes, content_type: str):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def touch(self, key: str, content_type: str):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={"Bucket": self.bucket, "Key": key},
+            MetadataDirective="REPLACE",
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    def modified_at(self, key: str) -> float | None:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response["LastModified"].timestamp()
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+def s3_from_env() -> S3BlobStore:
+    import boto3
+
+    return S3BlobStore(
+        boto3.client("s3", endpoint_url=S3_ENDPOINT_URL), S3_BUCKET, BLOB_BASE_URL
+    )
+
+
+blob_store = (
+    s3_from_env()
+    if BLOB_STORE == "s3"
+    else LocalBlobStore(BLOB_STORE_PATH, BLOB_BASE_URL)
+)
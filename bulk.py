@@ -0,0 +1,194 @@
+import csv
+import io
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from itertools import islice
+
+from pydantic import ValidationError
+from sqlalchemy import insert, inspect
+from sqlalchemy.exc import DBAPIError
+from starlette.concurrency import run_in_threadpool
+
+import changes
+import geo
+import stats
+from config import ChangeOperation, ImportFormat, ImportStatus
+from models import Properties
+from schemas import PropertyRequest
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+BULK_MAX_STORED_ERRORS = int(os.getenv("BULK_MAX_STORED_ERRORS", "1000"))
+EXPORT_COLUMNS = [attr.key for attr in inspect(Properties).column_attrs]
+
+
+def detect_format(filename: str | None, content_type: str | None) -> ImportFormat:
+    if (filename or "").lower().endswith((".ndjson", ".jsonl")) or (
+        content_type or ""
+    ).endswith(("ndjson", "jsonl")):
+        return ImportFormat.NDJSON
+    return ImportFormat.CSV
+
+
+def iter_records(binary_file, import_format: ImportFormat):
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    if import_format == ImportFormat.CSV:
+        yield from csv.DictReader(text_file)
+        return
+    for line in text_file:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            yield error
+
+
+def iter_batches(records, batch_size: int, skip: int = 0):
+    numbered = enumerate(islice(records, skip, None), start=skip + 1)
+    while batch := list(islice(numbered, batch_size)):
+        yield batch
+
+
+def property_values(property_request: PropertyRequest, agent_id) -> dict:
+    values = property_request.model_dump()
+    location = geo.parse_map(values["map"])
+    values.update(
+        id=uuid.uuid4(),
+        agent_id=agent_id,
+        version=1,
+        updated_at=datetime.now(timezone.utc),
+        latitude=location[0] if location else None,
+        longitude=location[1] if location else None,
+        geohash=geo.encode_geohash(*location) if location else None,
+    )
+    return values
+
+
+def validate_batch(batch, agent_id) -> tuple[list, list]:
+    values, errors = [], []
+    for row, record in batch:
+        if not isinstance(record, dict):
+            errors.append({"row": row, "errors": [f"Invalid record: {record}"]})
+            continue
+        record = {key: value if value != "" else None for key, value in record.items()}
+        try:
+            property_request = PropertyRequest.model_validate(record)
+        except ValidationError as error:
+            errors.append(
+                {
+                    "row": row,
+                    "errors": [
+                        f"{'.'.join(str(part) for part in detail['loc'])}: "
+                        f"{detail['msg']}"
+                        for detail in error.errors()
+                    ],
+                }
+            )
+            continue
+        values.append((row, property_values(property_request, agent_id)))
+    return values, errors
+
+
+async def insert_batch(db, values: list) -> list:
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(Properties), [value for _, value in values])
+        return []
+    except DBAPIError:
+        pass
+
+    errors = []
+    for row, value in values:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Properties), [value])
+        except DBAPIError as error:
+            errors.append({"row": row, "errors": [str(error.orig)]})
+    return errors
+
+
+def record_progress(job, processed: int, imported: int, errors: list):
+    job.rows_processed += processed
+    job.rows_imported += imported
+    job.rows_failed += len(errors)
+    stored = json.loads(job.errors)
+    stored.extend(errors[: max(0, BULK_MAX_STORED_ERRORS - len(stored))])
+    job.errors = json.dumps(stored)
+
+
+async def import_file(db, job, binary_file, batch_size: int = BULK_BATCH_SIZE):
+    batches = iter_batches(
+        iter_records(binary_file, job.format), batch_size, job.rows_processed
+    )
+    job.status = ImportStatus.EN_PROCESO
+    while True:
+        try:
+            batch = await run_in_threadpool(next, batches, None)
+        except (ValueError, csv.Error) as error:
+            job.errors = json.dumps(
+                json.loads(job.errors)
+                + [
+                    {
+                        "row": job.rows_processed + 1,
+                        "errors": [f"Unreadable file: {error}"],
+                    }
+                ]
+            )
+            job.status = ImportStatus.FALLIDA
+            await db.commit()
+            return job
+        if batch is None:
+            break
+        values, errors = await run_in_threadpool(validate_batch, batch, job.agent_id)
+        insert_errors = await insert_batch(db, values) if values else []
+        failed_rows = {error["row"] for error in insert_errors}
+        imported_ids = [value["id"] for row, value in values if row not in failed_rows]
+        await stats.record_changes(db, [], await stats.snapshot(db, imported_ids))
+        await changes.record(db, ChangeOperation.CREACION, imported_ids, job.agent_id)
+        record_progress(
+            job,
+            len(batch),
+            len(values) - len(insert_errors),
+            sorted(errors + insert_errors, key=lambda error: error["row"]),
+        )
+        await db.commit()
+    job.status = ImportStatus.COMPLETADA
+    await db.commit()
+    return job
+
+
+def job_summary(job) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "format": job.format,
+        "rows_processed": job.rows_processed,
+        "rows_imported": job.rows_imported,
+        "rows_failed": job.rows_failed,
+        "errors": json.loads(job.errors),
+    }
+
+
+def export_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_csv(session_factory, statement, chunk_size: int):
+    yield ",".join(EXPORT_COLUMNS) + "\r\n"
+    async with session_factory() as db:
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [export_value(value) for value in row] for row in partition
+            )
+            yield buffer.getvalue()
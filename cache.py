@@ -0,0 +1,133 @@
+import json
+import os
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+
+load_dotenv()
+
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+CACHE_LOCAL_TTL = int(
+    os.getenv("CACHE_LOCAL_TTL", "5" if os.getenv("REDIS_URL") else "300")
+)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "estatehub")
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: int):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str):
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            del self.entries[key]
+
+
+class RedisBackend:
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str):
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.client.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+def redis_from_url(url: str) -> RedisBackend:
+    import redis.asyncio
+
+    return RedisBackend(redis.asyncio.from_url(url))
+
+
+class Cache:
+    def __init__(
+        self,
+        shared: RedisBackend | None = None,
+        ttl: int = CACHE_TTL,
+        local_ttl: int = CACHE_LOCAL_TTL,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        prefix: str = CACHE_PREFIX,
+    ):
+        self.local = MemoryBackend(max_entries)
+        self.shared = shared
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.prefix = prefix
+        self.counters = defaultdict(
+            lambda: {"local_hits": 0, "shared_hits": 0, "misses": 0}
+        )
+
+    async def get_or_load(
+        self, namespace: str, key: str, loader, ttl: int | None = None
+    ):
+        local_key = f"{namespace}:{key}"
+        value = self.local.get(local_key)
+        if value is not None:
+            self.counters[namespace]["local_hits"] += 1
+            return value
+
+        shared_key = None
+        if self.shared is not None:
+            generation = await self.shared.get(f"{self.prefix}:{namespace}:generation")
+            shared_key = f"{self.prefix}:{namespace}:{int(generation or 0)}:{key}"
+            raw = await self.shared.get(shared_key)
+            if raw is not None:
+                self.counters[namespace]["shared_hits"] += 1
+                value = json.loads(raw)
+                self.local.set(local_key, value, self.local_ttl)
+                return value
+
+        self.counters[namespace]["misses"] += 1
+        value = jsonable_encoder(await loader())
+        self.local.set(local_key, value, min(self.local_ttl, ttl or self.ttl))
+        if shared_key is not None:
+            await self.shared.set(shared_key, json.dumps(value), ttl or self.ttl)
+        return value
+
+    async def invalidate(self, namespace: str):
+        self.local.delete_prefix(f"{namespace}:")
+        if self.shared is not None:
+            await self.shared.incr(f"{self.prefix}:{namespace}:generation")
+
+    def namespace_entries(self) -> Counter:
+        return Counter(key.split(":", 1)[0] for key in list(self.local.entries))
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.local.entries),
+            "max_entries": self.local.max_entries,
+            "shared": self.shared is not None,
+            "namespaces": {
+                namespace: dict(counters)
+                for namespace, counters in self.counters.items()
+            },
+        }
+
+
+cache = Cache(
+    shared=redis_from_url(os.environ["REDIS_URL"]) if os.getenv("REDIS_URL") else None
+)
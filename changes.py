@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import (
+    BigInteger,
+    Text,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+    tuple_,
+)
+from starlette import status
+
+import pagination
+import responses
+from config import ChangeOperation
+from database import AsyncSessionLocal, ReadSessionLocal
+from models import Properties, PropertyChanges
+
+load_dotenv()
+
+CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", "1"))
+CHANGES_HEARTBEAT_SECONDS = float(os.getenv("CHANGES_HEARTBEAT_SECONDS", "15"))
+CHANGES_STREAM_BATCH_SIZE = int(os.getenv("CHANGES_STREAM_BATCH_SIZE", "500"))
+CHANGES_RETENTION_DAYS = int(os.getenv("CHANGES_RETENTION_DAYS", "30"))
+CHANGES_PRUNE_INTERVAL = int(os.getenv("CHANGES_PRUNE_INTERVAL", "3600"))
+
+RESULT_OPERATIONS = {
+    "create": ChangeOperation.CREACION,
+    "update": ChangeOperation.ACTUALIZACION,
+    "delete": ChangeOperation.ELIMINACION,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def transaction_id(dialect_name: str):
+    if dialect_name == "postgresql":
+        return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+    return 0
+
+
+def visible(dialect_name: str):
+    if dialect_name == "postgresql":
+        return PropertyChanges.txid < cast(
+            cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger
+        )
+    return true()
+
+
+def encode_change_cursor(txid: int, change_id: int) -> str:
+    return pagination.encode_cursor({"txid": txid, "id": change_id})
+
+
+def decode_change_cursor(cursor: str | None) -> tuple[int, int]:
+    if cursor is None:
+        return (-1, 0)
+    values = pagination.decode_cursor(cursor)
+    if not isinstance(values.get("txid"), int) or not isinstance(values.get("id"), int):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return (values["txid"], values["id"])
+
+
+async def record(db, operation: ChangeOperation, property_ids, agent_id=None):
+    rows = [
+        {"property_id": property_id, "operation": operation, "agent_id": agent_id}
+        for property_id in property_ids
+    ]
+    if rows:
+        await db.execute(
+            insert(PropertyChanges).values(
+                txid=transaction_id(db.get_bind().dialect.name)
+            ),
+            rows,
+        )
+
+
+async def record_results(db, results: list, agent_id=None):
+    for op, operation in RESULT_OPERATIONS.items():
+        await record(
+            db,
+            operation,
+            [
+                result["id"]
+                for result in results
+                if result["op"] == op and result["status"] < 300
+            ],
+            agent_id,
+        )
+
+
+async def latest_cursor(db) -> str | None:
+    row = (
+        await db.execute(
+            select(PropertyChanges.txid, PropertyChanges.id)
+            .where(visible(db.get_bind().dialect.name))
+            .order_by(PropertyChanges.txid.desc(), PropertyChanges.id.desc())
+            .limit(1)
+        )
+    ).first()
+    return encode_change_cursor(row.txid, row.id) if row is not None else None
+
+
+async def cursor_expired(db, since: str | None) -> bool:
+    if since is None:
+        return False
+    oldest = (
+        await db.execute(
+            select(PropertyChanges.txid, PropertyChanges.id)
+            .order_by(PropertyChanges.txid, PropertyChanges.id)
+            .limit(1)
+        )
+    ).first()
+    return oldest is not None and decode_change_cursor(since) < tuple(oldest)
+
+
+async def read_changes(db, since: str | None, limit: int, columns: list | None = None):
+    rows = (
+        await db.execute(
+            select(
+                PropertyChanges.txid,
+                PropertyChanges.id,
+                PropertyChanges.property_id,
+                PropertyChanges.operation,
+                PropertyChanges.agent_id,
+                PropertyChanges.created_at,
+            )
+            .where(
+                tuple_(PropertyChanges.txid, PropertyChanges.id)
+                > tuple_(
+                    *(
+                        literal(value, BigInteger)
+                        for value in decode_change_cursor(since)
+                    )
+                ),
+                visible(db.get_bind().dialect.name),
+            )
+            .order_by(PropertyChanges.txid, PropertyChanges.id)
+            .limit(limit)
+        )
+    ).all()
+    items = [
+        {
+            "cursor": encode_change_cursor(row.txid, row.id),
+            "property_id": row.property_id,
+            "operation": row.operation,
+            "agent_id": row.agent_id,
+            "changed_at": row.created_at,
+        }
+        for row in rows
+    ]
+    if columns is not None and items:
+        current = {
+            row.id: row._asdict()
+            for row in await db.execute(
+                select(*columns).where(
+                    Properties.id.in_({item["property_id"] for item in items})
+                )
+            )
+        }
+        for item in items:
+            item["property"] = current.get(item["property_id"])
+    return {
+        "items": items,
+        "next_cursor": items[-1]["cursor"] if items else since,
+    }
+
+
+class ChangeNotifier:
+    def __init__(self, interval: float = CHANGES_POLL_INTERVAL):
+        self.interval = interval
+        self.latest = None
+        self.subscribers = 0
+        self.changed = None
+        self.task = None
+
+    async def poll(self):
+        try:
+            while self.subscribers:
+                try:
+                    async with ReadSessionLocal() as db:
+                        latest = await latest_cursor(db)
+                except Exception:
+                    logger.exception("Change feed poll failed")
+                else:
+                    if latest != self.latest:
+                        self.latest = latest
+                        self.changed.set()
+                        self.changed = asyncio.Event()
+                await asyncio.sleep(self.interval)
+        finally:
+            self.task = None
+
+    def subscribe(self):
+        self.subscribers += 1
+        if self.task is None:
+            self.changed = asyncio.Event()
+            self.task = asyncio.create_task(self.poll())
+
+    def unsubscribe(self):
+        self.subscribers -= 1
+
+
+notifier = ChangeNotifier()
+
+
+def format_event(item: dict) -> bytes:
+    return b"id: %s\nevent: change\ndata: %s\n\n" % (
+        item["cursor"].encode(),
+        responses.dumps(item),
+    )
+
+
+async def stream_events(since: str | None, columns: list | None = None):
+    notifier.subscribe()
+    try:
+        cursor = since
+        yield b"retry: %d\n\n" % (CHANGES_POLL_INTERVAL * 1000)
+        while True:
+            changed = notifier.changed
+            async with ReadSessionLocal() as db:
+                page = await read_changes(
+                    db, cursor, CHANGES_STREAM_BATCH_SIZE, columns
+                )
+            for item in page["items"]:
+                yield format_event(item)
+            cursor = page["next_cursor"]
+            if len(page["items"]) == CHANGES_STREAM_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), CHANGES_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+    finally:
+        notifier.unsubscribe()
+
+
+async def prune(db) -> int:
+    newest = select(func.max(PropertyChanges.id)).scalar_subquery()
+    cutoff = await db.scalar(select(func.now())) - timedelta(
+        days=CHANGES_RETENTION_DAYS
+    )
+    result = await db.execute(
+        delete(PropertyChanges).where(
+            PropertyChanges.created_at < cutoff, PropertyChanges.id < newest
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def prune_in_background():
+    async with AsyncSessionLocal() as db:
+        await prune(db)
@@ -56,3 +56,51 @@ class AppointmentStatus(str, Enum):
 class RoleUser(str, Enum):
     ADMIN = "admin"
     AGENT = "agent"
+
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class PropertiesSort(str, Enum):
+    ID = "id"
+    PRECIO = "price"
+    TAMANO = "size"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportStatus(str, Enum):
+    EN_PROCESO = "running"
+    COMPLETADA = "completed"
+    FALLIDA = "failed"
+
+
+class StatsGroupBy(str, Enum):
+    ESTADO = "state"
+    CIUDAD = "city"
+    TIPO = "type"
+    ESTATUS = "status"
+
+
+class ImageStatus(str, Enum):
+    PENDIENTE = "pending"
+    LISTA = "ready"
+    FALLIDA = "failed"
+
+
+class JobStatus(str, Enum):
+    EN_COLA = "queued"
+    EN_PROCESO = "running"
+    COMPLETADO = "succeeded"
+    FALLIDO = "failed"
+
+
+class ChangeOperation(str, Enum):
+    CREACION = "create"
+    ACTUALIZACION = "update"
+    ELIMINACION = "delete"
@@ -1,16 +1,187 @@
 import os
+import time
 
 from dotenv import load_dotenv
+from fastapi import HTTPException, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette import status
+
+from db_metrics import instrument
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+READ_METHODS = ("GET", "HEAD")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+ASYNC_SQLALCHEMY_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", get_async_url(SQLALCHEMY_DATABASE_URL)
+)
+
+
+def engine_options(url: str) -> dict:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)
+)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, **engine_options(ASYNC_SQLALCHEMY_DATABASE_URL)
+)
+replica_urls = [get_async_url(url) for url in DATABASE_REPLICA_URLS]
+replica_engines = [
+    create_async_engine(url, **engine_options(url)) for url in replica_urls
+]
+pool_metrics = {
+    "sync": instrument(engine, "sync"),
+    "async": instrument(async_engine.sync_engine, "async"),
+    **{
+        f"replica-{index}": instrument(replica.sync_engine, f"replica-{index}")
+        for index, replica in enumerate(replica_engines)
+    },
+}
+
+
+class ReplicaSet:
+    def __init__(self, engines: list, retry_seconds: float = DB_REPLICA_RETRY_SECONDS):
+        self.engines = engines
+        self.names = {
+            replica: f"replica-{index}" for index, replica in enumerate(engines)
+        }
+        self.retry_seconds = retry_seconds
+        self.unhealthy_until = {}
+        self.position = 0
+
+    def choose(self):
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            replica = self.engines[self.position % len(self.engines)]
+            self.position += 1
+            if self.unhealthy_until.get(replica, 0) <= now:
+                return replica
+        return None
+
+    def mark_unhealthy(self, replica):
+        self.unhealthy_until[replica] = time.monotonic() + self.retry_seconds
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            name: {
+                "healthy": self.unhealthy_until.get(replica, 0) <= now,
+                "retry_in": round(
+                    max(0, self.unhealthy_until.get(replica, 0) - now), 1
+                ),
+            }
+            for replica, name in self.names.items()
+        }
+
+
+replicas = ReplicaSet(replica_engines)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        replica = self.info.get("replica")
+        if replica is not None and not self.info.get("wrote"):
+            return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 Base = declarative_base()
+
+
+def ReadSessionLocal() -> AsyncSession:
+    return AsyncSessionLocal(info={"replica": replicas.choose()})
+
+
+async def get_db(request: Request):
+    replica = replicas.choose() if request.method in READ_METHODS else None
+    async with AsyncSessionLocal(info={"replica": replica}) as db:
+        while True:
+            metrics = pool_metrics[replicas.names.get(replica, "async")]
+            start = time.perf_counter()
+            try:
+                await db.connection()
+            except PoolTimeoutError:
+                metrics.timeouts += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Database is busy, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            except DBAPIError:
+                if replica is None:
+                    raise
+                replicas.mark_unhealthy(replica)
+                await db.rollback()
+                replica = replicas.choose()
+                db.info["replica"] = replica
+                continue
+            metrics.record_wait(time.perf_counter() - start)
+            break
+        yield db
@@ -0,0 +1,148 @@
+import logging
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_METRICS_WINDOW = int(os.getenv("DB_METRICS_WINDOW", "1000"))
+
+logger = logging.getLogger(__name__)
+
+request_queries = ContextVar("request_queries", default=None)
+
+
+def percentile(values, pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class PoolMetrics:
+    def __init__(self, name: str, window: int = DB_METRICS_WINDOW):
+        self.name = name
+        self.pool = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_times = deque(maxlen=window)
+        self.max_wait = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.slow_queries = 0
+        self.recent_slow_queries = deque(maxlen=20)
+
+    def record_wait(self, seconds: float):
+        self.wait_times.append(seconds)
+        self.max_wait = max(self.max_wait, seconds)
+
+    def record_query(self, statement: str, seconds: float):
+        self.queries += 1
+        self.query_seconds += seconds
+        totals = request_queries.get()
+        if totals is not None:
+            totals["count"] += 1
+            totals["seconds"] += seconds
+        if seconds * 1000 >= DB_SLOW_QUERY_MS:
+            self.record_slow_query(statement, seconds)
+
+    def record_slow_query(self, statement: str, seconds: float):
+        self.slow_queries += 1
+        self.recent_slow_queries.append(
+            {"ms": round(seconds * 1000, 2), "statement": statement[:500]}
+        )
+        logger.warning(
+            "Slow query on %s engine (%.1f ms): %s",
+            self.name,
+            seconds * 1000,
+            statement[:500],
+        )
+
+    def pool_status(self) -> dict:
+        status = {"class": type(self.pool).__name__}
+        for attribute in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(self.pool, attribute, None)
+            if callable(method):
+                status[attribute] = method()
+        timeout = getattr(self.pool, "timeout", None)
+        if callable(timeout):
+            status["timeout"] = timeout()
+        return status
+
+    def snapshot(self) -> dict:
+        waits = list(self.wait_times)
+        return {
+            "pool": self.pool_status(),
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "checkout_wait_ms": {
+                "samples": len(waits),
+                "p50": round(percentile(waits, 50) * 1000, 3) if waits else None,
+                "p95": round(percentile(waits, 95) * 1000, 3) if waits else None,
+                "p99": round(percentile(waits, 99) * 1000, 3) if waits else None,
+                "max": round(self.max_wait * 1000, 3),
+            },
+            "queries": self.queries,
+            "query_seconds": round(self.query_seconds, 6),
+            "slow_queries": self.slow_queries,
+            "slow_query_threshold_ms": DB_SLOW_QUERY_MS,
+        }
+
+
+def instrument(engine, name: str) -> PoolMetrics:
+    metrics = PoolMetrics(name)
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+        metrics.in_use += 1
+        metrics.peak_in_use = max(metrics.peak_in_use, metrics.in_use)
+
+    @event.listens_for(engine.pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+        metrics.in_use = max(0, metrics.in_use - 1)
+
+    @event.listens_for(engine.pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ):
+        connection.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ):
+        elapsed = time.perf_counter() - connection.info["query_start"].pop()
+        metrics.record_query(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        starts = exception_context.connection and exception_context.connection.info.get(
+            "query_start"
+        )
+        if starts:
+            starts.pop()
+
+    return metrics
@@ -0,0 +1,102 @@
+import re
+
+from sqlalchemy import column, func, inspect, literal_column, or_, table, text
+
+FTS_LANGUAGES = ("spanish", "english")
+SQLITE_FTS_TABLE = table("properties_fts", column("rowid"))
+
+
+def postgresql_vector(language: str) -> str:
+    return (
+        f"setweight(to_tsvector('{language}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{language}', coalesce(subtitle, '')), 'B') || "
+        f"setweight(to_tsvector('{language}', coalesce(description, '')), 'C')"
+    )
+
+
+POSTGRESQL_SETUP = [
+    "ALTER TABLE properties ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    + " || ".join(postgresql_vector(language) for language in FTS_LANGUAGES)
+    + ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_properties_search_vector "
+    "ON properties USING GIN (search_vector)",
+]
+
+SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5("
+    "title, subtitle, description, content='properties', content_rowid='rowid', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS properties_fts_ai AFTER INSERT ON properties BEGIN "
+    "INSERT INTO properties_fts(rowid, title, subtitle, description) "
+    "VALUES (new.rowid, new.title, new.subtitle, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS properties_fts_ad AFTER DELETE ON properties BEGIN "
+    "INSERT INTO properties_fts(properties_fts, rowid, title, subtitle, description) "
+    "VALUES ('delete', old.rowid, old.title, old.subtitle, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS properties_fts_au AFTER UPDATE ON properties BEGIN "
+    "INSERT INTO properties_fts(properties_fts, rowid, title, subtitle, description) "
+    "VALUES ('delete', old.rowid, old.title, old.subtitle, old.description); "
+    "INSERT INTO properties_fts(rowid, title, subtitle, description) "
+    "VALUES (new.rowid, new.title, new.subtitle, new.description); END",
+]
+SQLITE_REBUILD = "INSERT INTO properties_fts(properties_fts) VALUES ('rebuild')"
+FALLBACK_COLUMNS = ("title", "subtitle", "description")
+
+
+def setup_fulltext(engine):
+    statements = {"postgresql": POSTGRESQL_SETUP, "sqlite": SQLITE_SETUP}.get(
+        engine.dialect.name, []
+    )
+    with engine.begin() as connection:
+        created = engine.dialect.name == "sqlite" and not inspect(connection).has_table(
+            "properties_fts"
+        )
+        for statement in statements:
+            connection.execute(text(statement))
+        if created:
+            connection.execute(text(SQLITE_REBUILD))
+
+
+def query_terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def apply_fulltext(statement, dialect_name: str, q: str):
+    terms = query_terms(q)
+    if not terms:
+        return statement.where(False), None
+
+    if dialect_name == "postgresql":
+        expression = " & ".join(terms) + ":*"
+        tsquery = func.to_tsquery(FTS_LANGUAGES[0], expression)
+        for language in FTS_LANGUAGES[1:]:
+            tsquery = tsquery.op("||")(func.to_tsquery(language, expression))
+        search_vector = literal_column("properties.search_vector")
+        rank = func.ts_rank_cd(search_vector, tsquery)
+        return statement.where(search_vector.op("@@")(tsquery)), rank.desc()
+
+    if dialect_name == "sqlite":
+        expression = " ".join(f'"{term}"' for term in terms) + "*"
+        fts = literal_column("properties_fts")
+        statement = statement.join(
+            SQLITE_FTS_TABLE,
+            SQLITE_FTS_TABLE.c.rowid == literal_column("properties.rowid"),
+        ).where(fts.op("MATCH")(expression))
+        return statement, func.bm25(fts, 10.0, 5.0, 1.0).asc()
+
+    return (
+        statement.where(
+            *(
+                or_(
+                    *(
+                        func.lower(literal_column(f"properties.{name}")).contains(
+                            term, autoescape=True
+                        )
+                        for name in FALLBACK_COLUMNS
+                    )
+                )
+                for term in terms
+            )
+        ),
+        literal_column("properties.id"),
+    )
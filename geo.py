@@ -0,0 +1,156 @@
+import math
+import re
+
+from sqlalchemy import and_, or_
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 32
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = 100.0
+
+MAP_PATTERNS = [
+    re.compile(r"!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)"),
+    re.compile(r"@(-?\d+(?:\.\d+)?),\s*(-?\d+(?:\.\d+)?)"),
+    re.compile(
+        r"(?:[?&](?:q|ll|query|center)=)(-?\d+(?:\.\d+)?)(?:,|%2C)\s*(-?\d+(?:\.\d+)?)"
+    ),
+    re.compile(r"(-?\d{1,2}\.\d+)\s*[,;]\s*(-?\d{1,3}\.\d+)"),
+]
+
+
+def parse_map(value: str | None) -> tuple[float, float] | None:
+    if not value:
+        return None
+    for pattern in MAP_PATTERNS:
+        match = pattern.search(value)
+        if match is None:
+            continue
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+    return None
+
+
+def encode_geohash(
+    latitude: float, longitude: float, precision: int = GEOHASH_PRECISION
+) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+    while len(geohash) < precision:
+        interval, value = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(geohash)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def cover_bbox(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float
+) -> tuple[int, list[str]]:
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        columns = math.floor(max_lng / width) - math.floor(min_lng / width) + 1
+        if rows * columns <= MAX_COVER_CELLS:
+            break
+
+    cells = set()
+    latitude = min_lat
+    while True:
+        longitude = min_lng
+        while True:
+            cells.add(encode_geohash(latitude, longitude, precision))
+            if longitude >= max_lng:
+                break
+            longitude = min(longitude + width, max_lng)
+        if latitude >= max_lat:
+            break
+        latitude = min(latitude + height, max_lat)
+    return precision, sorted(cells)
+
+
+def split_viewport(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float
+) -> list[tuple[float, float, float, float]]:
+    if min_lng <= max_lng:
+        return [(min_lat, min_lng, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+
+
+def wrap_longitude(longitude: float) -> float:
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def bbox_around(
+    latitude: float, longitude: float, radius_km: float
+) -> tuple[float, float, float, float]:
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - lat_delta, latitude + lat_delta
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lng_delta = lat_delta / cos_lat
+    if min_lat <= -90.0 or max_lat >= 90.0 or lng_delta >= 180.0:
+        return (max(-90.0, min_lat), -180.0, min(90.0, max_lat), 180.0)
+    return (
+        min_lat,
+        wrap_longitude(longitude - lng_delta),
+        max_lat,
+        wrap_longitude(longitude + lng_delta),
+    )
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bbox_clause(model, min_lat, min_lng, max_lat, max_lng):
+    _, cells = cover_bbox(min_lat, min_lng, max_lat, max_lng)
+    return and_(
+        or_(
+            *(and_(model.geohash >= cell, model.geohash < cell + "~") for cell in cells)
+        ),
+        model.latitude.between(min_lat, max_lat),
+        model.longitude.between(min_lng, max_lng),
+    )
+
+
+def viewport_clause(model, min_lat, min_lng, max_lat, max_lng):
+    return or_(
+        *(
+            bbox_clause(model, *box)
+            for box in split_viewport(min_lat, min_lng, max_lat, max_lng)
+        )
+    )
+
+
+def apply_location(property_model):
+    location = parse_map(property_model.map)
+    if location is None:
+        property_model.latitude = None
+        property_model.longitude = None
+        property_model.geohash = None
+    else:
+        property_model.latitude, property_model.longitude = location
+        property_model.geohash = encode_geohash(*location)
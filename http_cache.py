@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+
+from fastapi import Request, Response
+from starlette import status
+
+from responses import ORJSONResponse
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "30"))
+HTTP_CACHE_STALE_WHILE_REVALIDATE = int(
+    os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", "60")
+)
+
+PUBLIC_CACHE_CONTROL = (
+    f"public, max-age={HTTP_CACHE_MAX_AGE}, "
+    f"stale-while-revalidate={HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x00")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def content_etag(content) -> str:
+    return make_etag(json.dumps(content, sort_keys=True, separators=(",", ":")))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    request: Request,
+    etag: str,
+    content,
+    cache_control: str = PUBLIC_CACHE_CONTROL,
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if callable(content):
+        content = content()
+    return ORJSONResponse(content, headers=headers)
@@ -0,0 +1,215 @@
+import os
+import zlib
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+
+load_dotenv()
+
+COMPRESSION_ENCODINGS = [
+    encoding.strip()
+    for encoding in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if encoding.strip()
+]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSION_CONTENT_TYPES = [
+    content_type.strip()
+    for content_type in os.getenv(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,application/x-ndjson,text/csv,text/plain,text/html",
+    ).split(",")
+    if content_type.strip()
+]
+
+
+class GzipCompressor:
+    def __init__(self, level: int = COMPRESSION_GZIP_LEVEL):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        output = self.compressor.compress(data)
+        if flush:
+            output += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return output
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int = COMPRESSION_BROTLI_QUALITY):
+        import brotli
+
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        output = self.compressor.process(data)
+        if flush:
+            output += self.compressor.flush()
+        return output
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int = COMPRESSION_ZSTD_LEVEL):
+        import zstandard
+
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        output = self.compressor.compress(data)
+        if flush:
+            output += self.compressor.flush(self.flush_block)
+        return output
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+COMPRESSORS = {"zstd": ZstdCompressor, "br": BrotliCompressor, "gzip": GzipCompressor}
+
+
+def available_encodings(encodings: list = COMPRESSION_ENCODINGS) -> list:
+    available = []
+    for encoding in encodings:
+        try:
+            COMPRESSORS[encoding]()
+        except (ImportError, KeyError):
+            continue
+        available.append(encoding)
+    return available
+
+
+def parse_accept_encoding(header: str) -> dict:
+    weights = {}
+    for part in header.split(","):
+        encoding, _, params = part.strip().partition(";")
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[encoding] = weight
+    return weights
+
+
+def choose_encoding(header: str, encodings: list) -> str | None:
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        encodings: list | None = None,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        content_types: list = COMPRESSION_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.encodings = available_encodings(
+            COMPRESSION_ENCODINGS if encodings is None else encodings
+        )
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressedResponder(self, encoding)(scope, receive, send)
+
+
+class CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    def eligible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        return (
+            self.start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and content_type.startswith(self.middleware.content_types)
+        )
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(scope=message)
+            if not self.eligible(headers):
+                self.passthrough = True
+                await self.send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            content_length = headers.get("content-length")
+            if (
+                content_length is not None
+                and int(content_length) < self.middleware.minimum_size
+            ):
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(scope=self.start)
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = COMPRESSORS[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.start)
+
+        if more_body:
+            body = self.compressor.compress(body, flush=True)
+        else:
+            body = self.compressor.compress(body) + self.compressor.finish()
+        await self.send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps
+from sqlalchemy import delete, select
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from blobstore import blob_store
+from config import ImageStatus
+from database import AsyncSessionLocal
+from models import PropertieImages
+
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", os.cpu_count() or 1))
+IMAGE_FORMATS = os.getenv("IMAGE_FORMATS", "webp,avif").split(",")
+IMAGE_CLEANUP_GRACE_SECONDS = int(os.getenv("IMAGE_CLEANUP_GRACE_SECONDS", "3600"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+VARIANT_WIDTHS = {"thumb": 320, "small": 640, "medium": 1024, "large": 1600}
+VARIANT_QUALITY = {"webp": {"quality": 80, "method": 4}, "avif": {"quality": 60}}
+SOURCE_FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "AVIF": ("avif", "image/avif"),
+    "GIF": ("gif", "image/gif"),
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def original_key(content_hash: str, extension: str) -> str:
+    return f"originals/{content_hash[:2]}/{content_hash}.{extension}"
+
+
+def variant_key(content_hash: str, name: str, image_format: str) -> str:
+    return f"variants/{content_hash[:2]}/{content_hash}/{name}.{image_format}"
+
+
+async def spool_upload(upload: UploadFile) -> tuple[str, str]:
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False) as spooled:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > IMAGE_MAX_BYTES:
+                spooled.close()
+                os.remove(spooled.name)
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Images can be at most {IMAGE_MAX_BYTES} bytes",
+                )
+            digest.update(chunk)
+            await run_in_threadpool(spooled.write, chunk)
+    return spooled.name, digest.hexdigest()
+
+
+def inspect_image(path: str) -> tuple[str, int, int]:
+    try:
+        with Image.open(path) as image:
+            image.verify()
+            image_format, (width, height) = image.format, image.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        image_format = None
+    if image_format not in SOURCE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported image, expected one of {', '.join(SOURCE_FORMATS)}",
+        )
+    return image_format, width, height
+
+
+async def store_original(upload: UploadFile) -> dict:
+    path, content_hash = await spool_upload(upload)
+    try:
+        image_format, width, height = await run_in_threadpool(inspect_image, path)
+        extension, content_type = SOURCE_FORMATS[image_format]
+        key = original_key(content_hash, extension)
+        if await run_in_threadpool(blob_store.exists, key):
+            await run_in_threadpool(blob_store.touch, key, content_type)
+        else:
+            await run_in_threadpool(blob_store.put_file, key, path, content_type)
+    finally:
+        os.remove(path)
+    return {
+        "storage_key": key,
+        "image_url": blob_store.url(key),
+        "content_hash": content_hash,
+        "content_type": content_type,
+        "width": width,
+        "height": height,
+    }
+
+
+def render_variants(data: bytes, widths: dict, formats: list) -> list:
+    rendered = []
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+        for name, width in widths.items():
+            if width > image.width and rendered:
+                continue
+            width = min(width, image.width)
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for image_format in formats:
+                buffer = io.BytesIO()
+                resized.save(
+                    buffer, image_format, **VARIANT_QUALITY.get(image_format, {})
+                )
+                rendered.append((name, image_format, width, height, buffer.getvalue()))
+    return rendered
+
+
+async def build_variants(content_hash: str, storage_key: str) -> dict:
+    data = await run_in_threadpool(blob_store.get_bytes, storage_key)
+    rendered = await asyncio.get_running_loop().run_in_executor(
+        get_executor(), render_variants, data, VARIANT_WIDTHS, IMAGE_FORMATS
+    )
+    variants = {}
+    for name, image_format, width, height, payload in rendered:
+        key = variant_key(content_hash, name, image_format)
+        if not await run_in_threadpool(blob_store.exists, key):
+            await run_in_threadpool(
+                blob_store.put_bytes, key, payload, f"image/{image_format}"
+            )
+        variant = variants.setdefault(name, {"width": width, "height": height})
+        variant[image_format] = blob_store.url(key)
+    return variants
+
+
+async def generate_variants(image_id):
+    async with AsyncSessionLocal() as db:
+        image_model = await db.get(PropertieImages, image_id)
+        if image_model is None or image_model.status != ImageStatus.PENDIENTE:
+            return
+        processed = await db.scalar(
+            select(PropertieImages)
+            .where(
+                PropertieImages.content_hash == image_model.content_hash,
+                PropertieImages.status == ImageStatus.LISTA,
+                PropertieImages.id != image_model.id,
+            )
+            .limit(1)
+        )
+        try:
+            if processed is not None:
+                variants = json.loads(processed.variants)
+            else:
+                variants = await build_variants(
+                    image_model.content_hash, image_model.storage_key
+                )
+        except (OSError, ValueError):
+            image_model.status = ImageStatus.FALLIDA
+        else:
+            image_model.variants = json.dumps(variants)
+            image_model.thumbnail_url = variants["thumb"][IMAGE_FORMATS[0]]
+            image_model.status = ImageStatus.LISTA
+        await db.commit()
+
+
+async def detach_images(db, property_ids) -> list:
+    if not property_ids:
+        return []
+    blobs = (
+        await db.execute(
+            select(PropertieImages.content_hash, PropertieImages.storage_key)
+            .where(
+                PropertieImages.property_id.in_(property_ids),
+                PropertieImages.content_hash.is_not(None),
+            )
+            .distinct()
+        )
+    ).all()
+    await db.execute(
+        delete(PropertieImages).where(PropertieImages.property_id.in_(property_ids))
+    )
+    return [[content_hash, storage_key] for content_hash, storage_key in blobs]
+
+
+def blob_keys(content_hash: str, storage_key: str | None) -> list:
+    keys = [
+        variant_key(content_hash, name, image_format)
+        for name in VARIANT_WIDTHS
+        for image_format in IMAGE_FORMATS
+    ]
+    return keys + [storage_key] if storage_key else keys
+
+
+async def delete_unreferenced_blobs(blobs: list) -> list:
+    async with AsyncSessionLocal() as db:
+        referenced = set(
+            (
+                await db.scalars(
+                    select(PropertieImages.content_hash).where(
+                        PropertieImages.content_hash.in_(
+                            {content_hash for content_hash, _ in blobs}
+                        )
+                    )
+                )
+            ).all()
+        )
+    deferred = []
+    for content_hash, storage_key in blobs:
+        if content_hash in referenced:
+            continue
+        modified_at = (
+            await run_in_threadpool(blob_store.modified_at, storage_key)
+            if storage_key
+            else None
+        )
+        if (
+            modified_at is not None
+            and time.time() - modified_at < IMAGE_CLEANUP_GRACE_SECONDS
+        ):
+            deferred.append([content_hash, storage_key])
+            continue
+        for key in blob_keys(content_hash, storage_key):
+            await run_in_threadpool(blob_store.delete, key)
+    return deferred
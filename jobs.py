@@ -0,0 +1,314 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from starlette.concurrency import run_in_threadpool
+
+import changes
+import imaging
+import similarity
+import stats
+from config import JobStatus
+from database import AsyncSessionLocal
+from models import Jobs
+
+load_dotenv()
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "600"))
+JOB_APP_WORKERS = int(os.getenv("JOB_APP_WORKERS", "1"))
+JOB_CLAIM_CANDIDATES = 5
+
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+HANDLERS = {}
+
+logger = logging.getLogger(__name__)
+
+
+def handler(kind: str):
+    def register(function):
+        HANDLERS[kind] = function
+        return function
+
+    return register
+
+
+@handler("similarity.refresh")
+async def refresh_similarity(payload: dict):
+    await run_in_threadpool(
+        similarity.refresh_in_background,
+        [uuid.UUID(property_id) for property_id in payload["property_ids"]],
+        payload.get("include_neighbors", True),
+    )
+
+
+@handler("similarity.rebuild")
+async def rebuild_similarity(payload: dict):
+    await run_in_threadpool(similarity.rebuild_in_background)
+
+
+@handler("images.variants")
+async def generate_image_variants(payload: dict):
+    await imaging.generate_variants(uuid.UUID(payload["image_id"]))
+
+
+@handler("images.cleanup")
+async def cleanup_images(payload: dict):
+    deferred = await imaging.delete_unreferenced_blobs(payload["blobs"])
+    if deferred:
+        async with AsyncSessionLocal() as db:
+            await enqueue_image_cleanup(
+                db,
+                deferred,
+                run_at=utcnow()
+                + timedelta(seconds=imaging.IMAGE_CLEANUP_GRACE_SECONDS),
+            )
+            await db.commit()
+
+
+@handler("stats.rebuild")
+async def rebuild_stats(payload: dict):
+    await stats.rebuild_in_background()
+
+
+@handler("changes.prune")
+async def prune_changes(payload: dict):
+    await changes.prune_in_background()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def backoff(attempts: int) -> timedelta:
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+async def enqueue(
+    db,
+    kind: str,
+    payload: dict | None = None,
+    priority: int = PRIORITY_NORMAL,
+    idempotency_key: str | None = None,
+    run_at: datetime | None = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+    agent_id=None,
+):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    dialect_insert = (
+        postgresql.insert
+        if db.get_bind().dialect.name == "postgresql"
+        else sqlite.insert
+    )
+    job_id = uuid.uuid4()
+    statement = dialect_insert(Jobs).values(
+        id=job_id,
+        kind=kind,
+        payload=json.dumps(jsonable_encoder(payload or {})),
+        priority=priority,
+        idempotency_key=idempotency_key,
+        run_at=run_at or utcnow(),
+        max_attempts=max_attempts,
+        agent_id=agent_id,
+    )
+    if idempotency_key is not None:
+        statement = statement.on_conflict_do_nothing(index_elements=["idempotency_key"])
+    inserted = await db.execute(statement)
+    if inserted.rowcount == 0:
+        return await db.scalar(
+            select(Jobs.id).where(Jobs.idempotency_key == idempotency_key)
+        )
+    return job_id
+
+
+async def enqueue_similarity_refresh(
+    db,
+    property_ids: list,
+    include_neighbors: bool = True,
+    idempotency_key: str | None = None,
+    agent_id=None,
+):
+    if not property_ids:
+        return None
+    return await enqueue(
+        db,
+        "similarity.refresh",
+        {"property_ids": property_ids, "include_neighbors": include_neighbors},
+        idempotency_key=idempotency_key,
+        agent_id=agent_id,
+    )
+
+
+async def enqueue_image_cleanup(
+    db, blobs: list, run_at: datetime | None = None, agent_id=None
+):
+    if not blobs:
+        return None
+    return await enqueue(
+        db,
+        "images.cleanup",
+        {"blobs": blobs},
+        priority=PRIORITY_LOW,
+        run_at=run_at,
+        agent_id=agent_id,
+    )
+
+
+async def claim(db, worker_id: str, kinds: list | None = None):
+    now = utcnow()
+    statement = (
+        select(Jobs.id)
+        .where(Jobs.status == JobStatus.EN_COLA, Jobs.run_at <= now)
+        .order_by(Jobs.priority.desc(), Jobs.run_at)
+        .limit(JOB_CLAIM_CANDIDATES)
+        .with_for_update(skip_locked=True)
+    )
+    if kinds:
+        statement = statement.where(Jobs.kind.in_(kinds))
+    for job_id in (await db.scalars(statement)).all():
+        claimed = await db.execute(
+            update(Jobs)
+            .where(Jobs.id == job_id, Jobs.status == JobStatus.EN_COLA)
+            .values(
+                status=JobStatus.EN_PROCESO,
+                locked_at=now,
+                locked_by=worker_id,
+                attempts=Jobs.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount == 1:
+            await db.commit()
+            return await db.get(Jobs, job_id, populate_existing=True)
+    await db.commit()
+    return None
+
+
+async def execute(job) -> str | None:
+    try:
+        await HANDLERS[job.kind](json.loads(job.payload))
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+async def finish(db, job, worker_id: str, error: str | None):
+    now = utcnow()
+    if error is None:
+        values = {"status": JobStatus.COMPLETADO, "finished_at": now}
+    elif job.attempts >= job.max_attempts or job.kind not in HANDLERS:
+        values = {"status": JobStatus.FALLIDO, "finished_at": now}
+    else:
+        values = {"status": JobStatus.EN_COLA, "run_at": now + backoff(job.attempts)}
+    await db.execute(
+        update(Jobs)
+        .where(Jobs.id == job.id, Jobs.locked_by == worker_id)
+        .values(**values, last_error=error, locked_at=None, locked_by=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def requeue_stale(db) -> int:
+    requeued = await db.execute(
+        update(Jobs)
+        .where(
+            Jobs.status == JobStatus.EN_PROCESO,
+            Jobs.locked_at < utcnow() - timedelta(seconds=JOB_LOCK_TIMEOUT),
+        )
+        .values(status=JobStatus.EN_COLA, locked_at=None, locked_by=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return requeued.rowcount
+
+
+async def run_next(worker_id: str, kinds: list | None = None) -> bool:
+    async with AsyncSessionLocal() as db:
+        job = await claim(db, worker_id, kinds)
+        if job is None:
+            return False
+        await finish(db, job, worker_id, await execute(job))
+    return True
+
+
+async def work(
+    worker_id: str | None = None,
+    kinds: list | None = None,
+    poll_interval: float = JOB_POLL_INTERVAL,
+):
+    worker_id = (
+        worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    )
+    last_sweep = 0.0
+    failures = 0
+    while True:
+        try:
+            if time.monotonic() - last_sweep > JOB_LOCK_TIMEOUT / 2:
+                async with AsyncSessionLocal() as db:
+                    await requeue_stale(db)
+                last_sweep = time.monotonic()
+            ran = await run_next(worker_id, kinds)
+        except Exception:
+            failures += 1
+            logger.exception("Job worker %s iteration failed", worker_id)
+            await asyncio.sleep(backoff(failures).total_seconds())
+            continue
+        failures = 0
+        if not ran:
+            await asyncio.sleep(poll_interval)
+
+
+async def schedule_periodically(kind: str, interval: int, priority: int = PRIORITY_LOW):
+    failures = 0
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await enqueue(
+                    db,
+                    kind,
+                    priority=priority,
+                    idempotency_key=f"{kind}:{int(time.time() // interval)}",
+                )
+                await db.commit()
+        except Exception:
+            failures += 1
+            logger.exception("Scheduling %s failed", kind)
+            await asyncio.sleep(min(interval, backoff(failures).total_seconds()))
+            continue
+        failures = 0
+        await asyncio.sleep(interval)
+
+
+def job_summary(job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": job.run_at,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "last_error": job.last_error,
+        "payload": json.loads(job.payload),
+    }
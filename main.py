@@ -1,17 +1,84 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
+from fastapi import Depends, FastAPI
+from fastapi.staticfiles import StaticFiles
+
+import imaging
 import models
+from blobstore import BLOB_BASE_URL, LocalBlobStore, blob_store
+from changes import CHANGES_PRUNE_INTERVAL
 from database import engine
-from routers import addressses, admin, agents, auth, cities, properties, states
+from fulltext import setup_fulltext
+from http_compression import CompressionMiddleware
+from jobs import JOB_APP_WORKERS, schedule_periodically, work
+from metrics import MetricsMiddleware
+from migrations import upgrade_schema
+from passwords import shutdown_executor
+from ratelimit import rate_limiter
+from routers import (
+    addressses,
+    admin,
+    agents,
+    auth,
+    cities,
+    health,
+    images,
+    jobs,
+    metrics,
+    options,
+    properties,
+    states,
+    stats,
+)
+from stats import STATS_REBUILD_INTERVAL
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = [asyncio.create_task(work()) for _ in range(JOB_APP_WORKERS)]
+    if STATS_REBUILD_INTERVAL > 0:
+        tasks.append(
+            asyncio.create_task(
+                schedule_periodically("stats.rebuild", STATS_REBUILD_INTERVAL)
+            )
+        )
+    if CHANGES_PRUNE_INTERVAL > 0:
+        tasks.append(
+            asyncio.create_task(
+                schedule_periodically("changes.prune", CHANGES_PRUNE_INTERVAL)
+            )
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+    with suppress(asyncio.CancelledError):
+        await asyncio.gather(*tasks)
+    shutdown_executor()
+    imaging.shutdown_executor()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(rate_limiter)])
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 models.Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+setup_fulltext(engine)
 
+app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(agents.router)
 app.include_router(states.router)
 app.include_router(cities.router)
 app.include_router(addressses.router)
+app.include_router(options.router)
 app.include_router(properties.router)
+app.include_router(stats.router)
+app.include_router(images.router)
+app.include_router(jobs.router)
+
+if isinstance(blob_store, LocalBlobStore):
+    app.mount(BLOB_BASE_URL, StaticFiles(directory=blob_store.root), name="media")
@@ -0,0 +1,173 @@
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from cache import cache
+from database import pool_metrics
+from db_metrics import request_queries
+
+SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+requests_total = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration",
+    ["method", "route"],
+)
+requests_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"]
+)
+response_size = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+request_queries_count = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+request_queries_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per HTTP request",
+    ["method", "route"],
+)
+rate_limited_total = Counter(
+    "rate_limited_total", "Requests rejected by the rate limiter", ["budget"]
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying passwords, including queueing",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+
+
+class PoolCollector:
+    def collect(self):
+        gauges = {
+            "in_use": GaugeMetricFamily(
+                "db_pool_in_use", "Connections checked out", labels=["engine"]
+            ),
+            "peak_in_use": GaugeMetricFamily(
+                "db_pool_peak_in_use",
+                "Most connections checked out at once",
+                labels=["engine"],
+            ),
+        }
+        counters = {
+            "connects": CounterMetricFamily(
+                "db_pool_connects", "New DBAPI connections", labels=["engine"]
+            ),
+            "checkouts": CounterMetricFamily(
+                "db_pool_checkouts", "Pool checkouts", labels=["engine"]
+            ),
+            "timeouts": CounterMetricFamily(
+                "db_pool_timeouts", "Pool checkout timeouts", labels=["engine"]
+            ),
+            "invalidations": CounterMetricFamily(
+                "db_pool_invalidations", "Invalidated connections", labels=["engine"]
+            ),
+            "queries": CounterMetricFamily(
+                "db_queries", "SQL statements executed", labels=["engine"]
+            ),
+            "query_seconds": CounterMetricFamily(
+                "db_query_seconds", "Time spent in SQL statements", labels=["engine"]
+            ),
+            "slow_queries": CounterMetricFamily(
+                "db_slow_queries",
+                "SQL statements over the slow threshold",
+                labels=["engine"],
+            ),
+        }
+        for name, metrics in pool_metrics.items():
+            for attribute, family in {**gauges, **counters}.items():
+                family.add_metric([name], getattr(metrics, attribute))
+        yield from gauges.values()
+        yield from counters.values()
+
+
+class CacheCollector:
+    def collect(self):
+        hits = CounterMetricFamily(
+            "cache_hits", "Cache hits", labels=["namespace", "tier"]
+        )
+        misses = CounterMetricFamily(
+            "cache_misses", "Cache misses", labels=["namespace"]
+        )
+        entries = GaugeMetricFamily(
+            "cache_entries", "Entries held in the local cache", labels=["namespace"]
+        )
+        entries_limit = GaugeMetricFamily("cache_max_entries", "Local cache capacity")
+        namespace_entries = cache.namespace_entries()
+        for namespace, counters in list(cache.counters.items()):
+            hits.add_metric([namespace, "local"], counters["local_hits"])
+            hits.add_metric([namespace, "shared"], counters["shared_hits"])
+            misses.add_metric([namespace], counters["misses"])
+        for namespace in namespace_entries.keys() | cache.counters.keys():
+            entries.add_metric([namespace], namespace_entries[namespace])
+        entries_limit.add_metric([], cache.local.max_entries)
+        yield from (hits, misses, entries, entries_limit)
+
+
+REGISTRY.register(PoolCollector())
+REGISTRY.register(CacheCollector())
+
+
+def route_label(scope: dict) -> str:
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        totals = {"count": 0, "seconds": 0.0}
+        response = {"status": 500, "size": 0}
+        token = request_queries.set(totals)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            request_queries.reset(token)
+            route = route_label(scope)
+            requests_total.labels(method, route, response["status"]).inc()
+            request_duration.labels(method, route).observe(elapsed)
+            response_size.labels(method, route).observe(response["size"])
+            request_queries_count.labels(method, route).observe(totals["count"])
+            request_queries_duration.labels(method, route).observe(totals["seconds"])
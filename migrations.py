@@ -0,0 +1,57 @@
+from sqlalchemy import Enum, inspect, literal, text
+
+from models import Base
+
+ADDED_COLUMNS = {
+    "properties": ["latitude", "longitude", "geohash", "version", "updated_at"],
+    "similar_properties": ["score", "rank"],
+    "propertie_images": [
+        "storage_key",
+        "content_hash",
+        "content_type",
+        "width",
+        "height",
+        "status",
+        "thumbnail_url",
+        "variants",
+    ],
+    "property_changes": ["txid"],
+}
+
+
+def add_column_statement(column, dialect) -> str:
+    preparer = dialect.identifier_preparer
+    statement = (
+        f"ALTER TABLE {preparer.format_table(column.table)} "
+        f"ADD COLUMN {preparer.format_column(column)} "
+        f"{column.type.compile(dialect=dialect)}"
+    )
+    if column.nullable:
+        return statement
+    value = (
+        column.default.arg(None) if column.default.is_callable else column.default.arg
+    )
+    default = literal(value, column.type).compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}
+    )
+    return f"{statement} NOT NULL DEFAULT {default}"
+
+
+def upgrade_schema(engine):
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table_name, column_names in ADDED_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table_name)}
+            table = Base.metadata.tables[table_name]
+            for name in column_names:
+                if name in existing:
+                    continue
+                column = table.c[name]
+                if isinstance(column.type, Enum):
+                    column.type.create(connection, checkfirst=True)
+                connection.execute(
+                    text(add_column_statement(column, connection.dialect))
+                )
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
@@ -2,19 +2,33 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     Date,
+    DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     Uuid,
+    func,
 )
 from sqlalchemy import Enum as SqlEnum
+from sqlalchemy.orm import relationship
 
-from config import PropertiesStatus, PropertiesType, RoleUser
+from config import (
+    ChangeOperation,
+    ImageStatus,
+    ImportFormat,
+    ImportStatus,
+    JobStatus,
+    PropertiesStatus,
+    PropertiesType,
+    RoleUser,
+)
 from database import Base
 
 
@@ -44,6 +58,47 @@ class Properties(Base):
     description = Column(Text, nullable=False)
     video = Column(String, nullable=True)
     map = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    address = relationship("Addresses", lazy="raise")
+    agent = relationship("Agents", lazy="raise")
+    images = relationship("PropertieImages", lazy="raise")
+    options = relationship(
+        "PropertieOptions", secondary="propertie_assigned_options", lazy="raise"
+    )
+
+    __table_args__ = (
+        Index("ix_properties_price_id", "price", "id"),
+        Index("ix_properties_size_id", "size", "id"),
+        Index(
+            "ix_properties_status_type_price_id",
+            "status",
+            "type",
+            "price",
+            "id",
+            postgresql_include=["size", "bedrooms", "bathrooms"],
+        ),
+        Index(
+            "ix_properties_status_price_id",
+            "status",
+            "price",
+            "id",
+            postgresql_include=["type", "size", "bedrooms", "bathrooms"],
+        ),
+        Index("ix_properties_agent_id_price_id", "agent_id", "price", "id"),
+        Index("ix_properties_address_id", "address_id"),
+        Index("ix_properties_geohash", "geohash"),
+    )
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Agents(Base):
@@ -76,6 +131,13 @@ class SimilarProperties(Base):
     id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
     property_id = Column(Uuid, ForeignKey("properties.id"))
     similar_property_id = Column(Uuid, ForeignKey("properties.id"))
+    score = Column(Float, nullable=False, default=0)
+    rank = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_similar_properties_property_id_rank", "property_id", "rank"),
+        Index("ix_similar_properties_similar_property_id", "similar_property_id"),
+    )
 
 
 class PropertieImages(Base):
@@ -86,6 +148,18 @@ class PropertieImages(Base):
     image_url = Column(String, nullable=False)
     is_thimbnail = Column(Boolean, nullable=False, default=False)
     created_at = Column(Date, nullable=False, default=datetime.now(timezone.utc))
+    storage_key = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+    content_type = Column(String, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    status = Column(
+        SqlEnum(ImageStatus, values_callable=get_enum_values),
+        nullable=False,
+        default=ImageStatus.LISTA,
+    )
+    thumbnail_url = Column(String, nullable=True)
+    variants = Column(Text, nullable=False, default="{}")
 
 
 class PropertieOptions(Base):
@@ -119,6 +193,14 @@ class Addresses(Base):
     city_id = Column(Uuid, ForeignKey("cities.id"))
     address = Column(String, nullable=False)
 
+    city = relationship("Cities", lazy="raise")
+    state = relationship("States", lazy="raise")
+
+    __table_args__ = (
+        Index("ix_addresses_city_id_id", "city_id", "id"),
+        Index("ix_addresses_state_id_city_id_id", "state_id", "city_id", "id"),
+    )
+
 
 class States(Base):
     __tablename__ = "states"
@@ -149,3 +231,144 @@ class Cities(Base):
     is_active = Column(Boolean, nullable=False, default=True)
     city = Column(String, nullable=False)
     state_id = Column(Uuid, ForeignKey("states.id"))
+
+    state = relationship("States", lazy="raise")
+
+
+class ImportJobs(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    agent_id = Column(Uuid, ForeignKey("agents.id"))
+    format = Column(SqlEnum(ImportFormat, values_callable=get_enum_values))
+    status = Column(
+        SqlEnum(ImportStatus, values_callable=get_enum_values),
+        nullable=False,
+        default=ImportStatus.EN_PROCESO,
+    )
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=False, default="[]")
+
+
+class RefreshTokens(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    agent_id = Column(Uuid, ForeignKey("agents.id"), nullable=False, index=True)
+    family_id = Column(Uuid, nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+
+
+class PropertyStats(Base):
+    __tablename__ = "property_stats"
+
+    group_key = Column(String, primary_key=True)
+    state_id = Column(Uuid, ForeignKey("states.id"), index=True)
+    city_id = Column(Uuid, ForeignKey("cities.id"), index=True)
+    type = Column(
+        SqlEnum(PropertiesType, values_callable=get_enum_values), nullable=False
+    )
+    status = Column(
+        SqlEnum(PropertiesStatus, values_callable=get_enum_values), nullable=False
+    )
+    count = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Float, nullable=False, default=0)
+    size_sum = Column(Float, nullable=False, default=0)
+    price_per_m2_sum = Column(Float, nullable=False, default=0)
+    price_per_m2_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class PropertyPriceHistogram(Base):
+    __tablename__ = "property_price_histogram"
+
+    group_key = Column(String, ForeignKey("property_stats.group_key"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class Jobs(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default="{}")
+    status = Column(
+        SqlEnum(JobStatus, values_callable=get_enum_values),
+        nullable=False,
+        default=JobStatus.EN_COLA,
+    )
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    locked_at = Column(DateTime(timezone=True))
+    locked_by = Column(String)
+    finished_at = Column(DateTime(timezone=True))
+    idempotency_key = Column(String, unique=True)
+    agent_id = Column(Uuid, ForeignKey("agents.id"))
+    last_error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_jobs_status_priority_run_at", "status", "priority", "run_at"),
+    )
+
+
+class PropertyChanges(Base):
+    __tablename__ = "property_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    txid = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True,
+    )
+    property_id = Column(Uuid, nullable=False)
+    operation = Column(
+        SqlEnum(ChangeOperation, values_callable=get_enum_values), nullable=False
+    )
+    agent_id = Column(Uuid, ForeignKey("agents.id"))
+
+    __table_args__ = (Index("ix_property_changes_txid_id", "txid", "id"),)
@@ -0,0 +1,209 @@
+import base64
+import binascii
+import json
+import os
+
+from fastapi import HTTPException
+from sqlalchemy import and_, inspect, or_, select
+from starlette import status
+
+import responses
+from config import SortOrder
+from utils import convert_to_uuid
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+STREAM_FLUSH_BYTES = int(os.getenv("STREAM_FLUSH_BYTES", "16384"))
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        values = None
+    if not isinstance(values, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return values
+
+
+def model_to_dict(model) -> dict:
+    return {
+        attr.key: getattr(model, attr.key)
+        for attr in inspect(model).mapper.column_attrs
+    }
+
+
+def response_columns(model, schema) -> list:
+    return [model.__table__.c[name] for name in schema.model_fields]
+
+
+def parse_fields(fields: str | None, schema, virtual: tuple = ()) -> list | None:
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(schema.model_fields) - set(virtual))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return list(dict.fromkeys(["id", *names]))
+
+
+def field_columns(model, names) -> list:
+    return [model.__table__.c[name] for name in dict.fromkeys(names)]
+
+
+def keyset_statement(
+    model,
+    cursor: str | None = None,
+    sort_column=None,
+    order: SortOrder = SortOrder.ASC,
+    statement=None,
+):
+    statement = select(model) if statement is None else statement
+    sort_key = sort_column.key if sort_column is not None else "id"
+    descending = order == SortOrder.DESC
+
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if values.get("sort") != sort_key or values.get("order") != order.value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match the requested sort",
+            )
+        last_id = convert_to_uuid(str(values.get("id")))
+        if last_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        id_after = model.id < last_id if descending else model.id > last_id
+        if sort_column is None:
+            statement = statement.where(id_after)
+        else:
+            last_value = values.get("value")
+            value_after = (
+                sort_column < last_value if descending else sort_column > last_value
+            )
+            statement = statement.where(
+                or_(value_after, and_(sort_column == last_value, id_after))
+            )
+
+    order_by = [model.id.desc() if descending else model.id.asc()]
+    if sort_column is not None:
+        order_by.insert(0, sort_column.desc() if descending else sort_column.asc())
+    return statement.order_by(*order_by)
+
+
+def next_cursor(rows: list, limit: int, sort_column=None, order=SortOrder.ASC):
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    values = {
+        "sort": sort_column.key if sort_column is not None else "id",
+        "order": order.value,
+        "id": str(last.id),
+    }
+    if sort_column is not None:
+        values["value"] = getattr(last, sort_column.key)
+    return encode_cursor(values)
+
+
+async def paginate(
+    db,
+    model,
+    limit: int,
+    cursor: str | None = None,
+    sort_column=None,
+    order: SortOrder = SortOrder.ASC,
+    statement=None,
+):
+    statement = keyset_statement(model, cursor, sort_column, order, statement)
+    rows = (await db.scalars(statement.limit(limit + 1))).all()
+    return {
+        "items": rows[:limit],
+        "next_cursor": next_cursor(rows, limit, sort_column, order),
+    }
+
+
+async def paginate_rows(
+    db,
+    model,
+    columns: list,
+    limit: int,
+    cursor: str | None = None,
+    sort_column=None,
+    order: SortOrder = SortOrder.ASC,
+    statement=None,
+):
+    statement = keyset_statement(
+        model,
+        cursor,
+        sort_column,
+        order,
+        select(*columns) if statement is None else statement,
+    )
+    rows = (await db.execute(statement.limit(limit + 1))).all()
+    return {
+        "items": [row._asdict() for row in rows[:limit]],
+        "next_cursor": next_cursor(rows, limit, sort_column, order),
+    }
+
+
+async def paginate_ranked(
+    db, statement, rank, limit: int, cursor: str | None = None, rows: bool = False
+):
+    offset = 0
+    if cursor is not None:
+        offset = decode_cursor(cursor).get("offset")
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+    statement = statement.order_by(rank).offset(offset).limit(limit + 1)
+    if rows:
+        items = [row._asdict() for row in (await db.execute(statement)).all()]
+    else:
+        items = (await db.scalars(statement)).all()
+    return {
+        "items": items[:limit],
+        "next_cursor": (
+            encode_cursor({"offset": offset + limit}) if len(items) > limit else None
+        ),
+    }
+
+
+def stream_ndjson(
+    session_factory,
+    model,
+    cursor: str | None = None,
+    sort_column=None,
+    order: SortOrder = SortOrder.ASC,
+    statement=None,
+):
+    statement = keyset_statement(model, cursor, sort_column, order, statement)
+
+    async def generate():
+        async with session_factory() as db:
+            result = await db.stream_scalars(
+                statement.execution_options(yield_per=STREAM_CHUNK_SIZE)
+            )
+            buffer = bytearray()
+            async for row in result:
+                buffer += responses.dumps(model_to_dict(row)) + b"\n"
+                if len(buffer) >= STREAM_FLUSH_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+            if buffer:
+                yield bytes(buffer)
+
+    return generate()
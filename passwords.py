@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette import status
+
+from metrics import password_hash_duration
+
+load_dotenv()
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_SIZE = int(
+    os.getenv("PASSWORD_HASH_QUEUE_SIZE", PASSWORD_HASH_WORKERS * 4)
+)
+
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor = None
+_pending = 0
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+            )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _hash(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt_context.verify(password, hashed_password)
+
+
+async def run_in_pool(func, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def timed(operation: str, func, *args):
+    start = time.perf_counter()
+    result = await run_in_pool(func, *args)
+    password_hash_duration.labels(operation).observe(time.perf_counter() - start)
+    return result
+
+
+async def hash_password(password: str) -> str:
+    return await timed("hash", _hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await timed("verify", _verify, password, hashed_password)
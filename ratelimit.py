@@ -0,0 +1,208 @@
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+from starlette import status
+
+from metrics import rate_limited_total
+from routers.auth import get_current_agent
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", os.getenv("REDIS_URL"))
+RATE_LIMIT_PREFIX = os.getenv("RATE_LIMIT_PREFIX", "estatehub:ratelimit")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_READ = os.getenv("RATE_LIMIT_READ", "50/second")
+RATE_LIMIT_SEARCH = os.getenv("RATE_LIMIT_SEARCH", "20/second")
+RATE_LIMIT_NEARBY = os.getenv("RATE_LIMIT_NEARBY", "30/second")
+RATE_LIMIT_VIEWPORT = os.getenv("RATE_LIMIT_VIEWPORT", "30/second")
+RATE_LIMIT_SIMILAR = os.getenv("RATE_LIMIT_SIMILAR", "20/second")
+RATE_LIMIT_EXPORT = os.getenv("RATE_LIMIT_EXPORT", "10/minute")
+RATE_LIMIT_WRITE = os.getenv("RATE_LIMIT_WRITE", "10/second")
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/minute")
+RATE_LIMIT_FORWARDED_HEADER = os.getenv("RATE_LIMIT_FORWARDED_HEADER")
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1"))
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+ROUTE_BUDGETS = {
+    ("GET", "/health/"): None,
+    ("GET", "/health/db"): None,
+    ("GET", "/metrics"): None,
+    ("POST", "/auth/"): "auth",
+    ("POST", "/auth/token"): "auth",
+    ("PUT", "/agents/password"): "auth",
+    ("GET", "/properties/search"): "search",
+    ("GET", "/properties/nearby"): "nearby",
+    ("GET", "/properties/viewport"): "viewport",
+    ("GET", "/properties/{property_id}/similar"): "similar",
+    ("GET", "/properties/export"): "export",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class Limit:
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+
+
+def parse_limit(value: str) -> Limit:
+    count, _, period = value.partition("/")
+    seconds = PERIODS[period] if period in PERIODS else float(period)
+    return Limit(int(count), int(count) / seconds)
+
+
+class MemoryBuckets:
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self.buckets[key] = (tokens, now)
+        self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    def __init__(self, client):
+        import redis.exceptions
+
+        self.script = client.register_script(TAKE_SCRIPT)
+        self.errors = (redis.exceptions.RedisError, OSError)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        try:
+            return float(
+                await self.script(keys=[key], args=[limit.capacity, limit.rate])
+            )
+        except self.errors as exc:
+            logger.warning("Rate limit backend unavailable, allowing request: %s", exc)
+            return 0.0
+
+
+def redis_buckets_from_url(url: str) -> RedisBuckets:
+    import redis.asyncio
+
+    return RedisBuckets(redis.asyncio.from_url(url))
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_FORWARDED_HEADER:
+        header = request.headers.get(RATE_LIMIT_FORWARDED_HEADER, "")
+        forwarded = [address.strip() for address in header.split(",")]
+        forwarded = [address for address in forwarded if address]
+        if forwarded:
+            return forwarded[-min(RATE_LIMIT_TRUSTED_PROXIES, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        backend=None,
+        budgets: dict | None = None,
+        prefix: str = RATE_LIMIT_PREFIX,
+        enabled: bool = RATE_LIMIT_ENABLED,
+    ):
+        self.backend = backend or MemoryBuckets()
+        self.budgets = {
+            name: parse_limit(value)
+            for name, value in (
+                budgets
+                or {
+                    "read": RATE_LIMIT_READ,
+                    "search": RATE_LIMIT_SEARCH,
+                    "nearby": RATE_LIMIT_NEARBY,
+                    "viewport": RATE_LIMIT_VIEWPORT,
+                    "similar": RATE_LIMIT_SIMILAR,
+                    "export": RATE_LIMIT_EXPORT,
+                    "write": RATE_LIMIT_WRITE,
+                    "auth": RATE_LIMIT_AUTH,
+                }
+            ).items()
+        }
+        self.prefix = prefix
+        self.enabled = enabled
+
+    def budget(self, request: Request) -> str | None:
+        method = "GET" if request.method == "HEAD" else request.method
+        path = getattr(request.scope.get("route"), "path", request.url.path)
+        if (method, path) in ROUTE_BUDGETS:
+            return ROUTE_BUDGETS[(method, path)]
+        return "read" if method == "GET" else "write"
+
+    async def identity(self, request: Request) -> str:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                return f"agent:{(await get_current_agent(token))['id']}"
+            except HTTPException:
+                pass
+        return f"ip:{client_ip(request)}"
+
+    async def __call__(self, request: Request):
+        if not self.enabled:
+            return
+        budget = self.budget(request)
+        if budget is None:
+            return
+        identity = await self.identity(request)
+        wait = await self.backend.take(
+            f"{self.prefix}:{budget}:{identity}", self.budgets[budget]
+        )
+        if wait > 0:
+            rate_limited_total.labels(budget).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+rate_limiter = RateLimiter(
+    backend=(
+        redis_buckets_from_url(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else None
+    )
+)
@@ -0,0 +1,18 @@
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=default)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,12 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from database import SessionLocal
+import pagination
+from database import ReadSessionLocal, get_db
 from models import Addresses
-from schemas import AddressRequest
+from responses import ORJSONResponse
+from schemas import AddressRequest, AddressResponse, Page
 from utils import convert_to_uuid
 
 from .auth import get_current_agent
@@ -17,31 +21,59 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
-agent_dependency = Annotated[dict, Depends(get_current_agent)]
+ADDRESS_COLUMNS = pagination.response_columns(Addresses, AddressResponse)
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def read_all(db: db_dependency):
-    return db.query(Addresses).all()
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[AddressResponse])
+async def read_all(
+    db: db_dependency,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    stream: bool = False,
+    fields: str | None = None,
+):
+    names = pagination.parse_fields(fields, AddressResponse)
+    if names is not None and stream:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fields cannot be combined with stream",
+        )
+    if stream:
+        return StreamingResponse(
+            pagination.stream_ndjson(ReadSessionLocal, Addresses, cursor),
+            media_type="application/x-ndjson",
+        )
+    if names is None:
+        return await pagination.paginate_rows(
+            db, Addresses, ADDRESS_COLUMNS, limit, cursor
+        )
+    return ORJSONResponse(
+        await pagination.paginate_rows(
+            db, Addresses, pagination.field_columns(Addresses, names), limit, cursor
+        )
+    )
 
 
-@router.get("/{address_id}", status_code=status.HTTP_200_OK)
-async def read_address(db: db_dependency, address_id: str):
-    address_model = (
-        db.query(Addresses).filter(Addresses.id == convert_to_uuid(address_id)).first()
+@router.get(
+    "/{address_id}", status_code=status.HTTP_200_OK, response_model=AddressResponse
+)
+async def read_address(db: db_dependency, address_id: str, fields: str | None = None):
+    names = pagination.parse_fields(fields, AddressResponse)
+    columns = (
+        ADDRESS_COLUMNS if names is None else pagination.field_columns(Addresses, names)
     )
+    row = (
+        await db.execute(
+            select(*columns).where(Addresses.id == convert_to_uuid(address_id))
+        )
+    ).first()
 
-    if address_model is not None:
-        return address_model
+    if row is not None:
+        return row._asdict() if names is None else ORJSONResponse(row._asdict())
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND, detail="Address not found"
     )
@@ -57,35 +89,35 @@ async def create_address(
         )
     address_model = Addresses(**address_request.dict())
     db.add(address_model)
-    db.commit()
+    await db.commit()
 
 
 @router.put("/{address_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_address(
     db: db_dependency, address_request: AddressRequest, address_id: str
 ):
-    address_model = (
-        db.query(Addresses).filter(Addresses.id == convert_to_uuid(address_id)).first()
+    address_model = await db.scalar(
+        select(Addresses).where(Addresses.id == convert_to_uuid(address_id))
     )
     if address_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Address not found"
         )
-        address_model.address = address_request.address
+    address_model.address = address_request.address
 
-        db.add(address_model)
-        db.commit()
+    db.add(address_model)
+    await db.commit()
 
 
 @router.delete("/{address_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_address(db: db_dependency, address_id: str):
-    address_model = (
-        db.query(Addresses).filter(Addresses.id == convert_to_uuid(address_id)).first()
+    address_model = await db.scalar(
+        select(Addresses).where(Addresses.id == convert_to_uuid(address_id))
     )
     if address_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Address not found"
         )
-    db.query(Addresses).filter(Addresses.id == address_id).delete()
+    await db.execute(delete(Addresses).where(Addresses.id == address_model.id))
 
-    db.commit()
+    await db.commit()
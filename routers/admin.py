@@ -1,12 +1,21 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+import batch
+import changes
 import config
-from database import SessionLocal
-from models import Properties
+import imaging
+import jobs
+import similarity
+import stats
+from cache import cache
+from database import get_db, pool_metrics
+from models import PropertieAssignedOptions, Properties
+from schemas import CacheStatsResponse, EngineStatsResponse, PropertyBatchDelete
 from utils import convert_to_uuid
 
 from .auth import get_current_agent
@@ -17,33 +26,121 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 agent_dependency = Annotated[dict, Depends(get_current_agent)]
 
 
 @router.delete("/property/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_property(agent: agent_dependency, db: db_dependency, property_id: str):
+async def delete_property(
+    agent: agent_dependency,
+    db: db_dependency,
+    property_id: str,
+):
     if agent is None or agent.get("role") != config.RoleUser.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
-    property_model = (
-        db.query(Properties)
-        .filter(Properties.id == convert_to_uuid(property_id))
-        .first()
+    property_model = await db.scalar(
+        select(Properties).where(Properties.id == convert_to_uuid(property_id))
     )
     if property_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
         )
-    db.query(Properties).filter(Properties.id == convert_to_uuid(property_id)).delete()
+    referrers = await similarity.detach_properties(db, [property_model.id])
+    blobs = await imaging.detach_images(db, [property_model.id])
+    await db.execute(
+        delete(PropertieAssignedOptions).where(
+            PropertieAssignedOptions.property_id == property_model.id
+        )
+    )
+    before = await stats.snapshot(db, [property_model.id])
+    await db.execute(delete(Properties).where(Properties.id == property_model.id))
+    await stats.record_changes(db, before, [])
+    await changes.record(
+        db,
+        config.ChangeOperation.ELIMINACION,
+        [property_model.id],
+        convert_to_uuid(agent.get("id")),
+    )
+    await jobs.enqueue_similarity_refresh(db, referrers, include_neighbors=False)
+    await jobs.enqueue_image_cleanup(db, blobs)
+
+    await db.commit()
+
+
+@router.post("/property/batch-delete", status_code=status.HTTP_200_OK)
+async def batch_delete_properties(
+    agent: agent_dependency,
+    db: db_dependency,
+    batch_request: PropertyBatchDelete,
+):
+    if agent is None or agent.get("role") != config.RoleUser.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    batch.check_batch_size(batch_request)
+
+    existing = await batch.existing_rows(db, Properties, batch_request.delete)
+    referrers = await similarity.detach_properties(db, list(existing))
+    blobs = await imaging.detach_images(db, list(existing))
+    if existing:
+        await db.execute(
+            delete(PropertieAssignedOptions).where(
+                PropertieAssignedOptions.property_id.in_(list(existing))
+            )
+        )
+    before = await stats.snapshot(db, list(existing))
+    results = await batch.apply_batch(
+        db, Properties, [], [], batch_request.delete, existing
+    )
+    await stats.record_changes(db, before, [])
+    await changes.record_results(db, results, convert_to_uuid(agent.get("id")))
+    await jobs.enqueue_similarity_refresh(db, referrers, include_neighbors=False)
+    await jobs.enqueue_image_cleanup(db, blobs)
+    await db.commit()
+    return {"results": results}
+
+
+@router.post("/stats/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_stats(agent: agent_dependency, db: db_dependency):
+    if agent is None or agent.get("role") != config.RoleUser.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    job_id = await jobs.enqueue(
+        db,
+        "stats.rebuild",
+        priority=jobs.PRIORITY_HIGH,
+        agent_id=convert_to_uuid(agent.get("id")),
+    )
+    await db.commit()
+    return {"job_id": job_id}
 
-    db.commit()
+
+@router.get(
+    "/db",
+    status_code=status.HTTP_200_OK,
+    response_model=dict[str, EngineStatsResponse],
+)
+async def read_db_stats(agent: agent_dependency):
+    if agent is None or agent.get("role") != config.RoleUser.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    return {
+        name: {
+            **metrics.snapshot(),
+            "recent_slow_queries": list(metrics.recent_slow_queries),
+        }
+        for name, metrics in pool_metrics.items()
+    }
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK, response_model=CacheStatsResponse)
+async def read_cache_stats(agent: agent_dependency):
+    if agent is None or agent.get("role") != config.RoleUser.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    return cache.stats()
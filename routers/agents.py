@@ -1,13 +1,14 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from database import SessionLocal
+from database import get_db
 from models import Agents
-from schemas import AgentVerification
+from passwords import hash_password, verify_password
+from schemas import AgentResponse, AgentVerification
 from utils import convert_to_uuid
 
 from .auth import get_current_agent
@@ -18,27 +19,18 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 agent_dependency = Annotated[dict, Depends(get_current_agent)]
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
+@router.get("/", status_code=status.HTTP_200_OK, response_model=AgentResponse)
 async def get_agent(agent: agent_dependency, db: db_dependency):
     if agent is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
-    return (
-        db.query(Agents).filter(Agents.id == convert_to_uuid(agent.get("id"))).first()
+    return await db.scalar(
+        select(Agents).where(Agents.id == convert_to_uuid(agent.get("id")))
     )
 
 
@@ -51,18 +43,18 @@ async def change_password(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
 
-    agent_model = (
-        db.query(Agents).filter(Agents.id == convert_to_uuid(agent.get("id"))).first()
+    agent_model = await db.scalar(
+        select(Agents).where(Agents.id == convert_to_uuid(agent.get("id")))
     )
 
-    if not bcrypt_context.verify(
+    if not await verify_password(
         agent_verification.password, agent_model.hashed_password
     ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Error on password change"
         )
 
-    agent_model.hashed_password = bcrypt_context.hash(agent_verification.new_password)
+    agent_model.hashed_password = await hash_password(agent_verification.new_password)
 
     db.add(agent_model)
-    db.commit()
+    await db.commit()
@@ -1,64 +1,82 @@
-import os
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
-from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from database import SessionLocal
-from models import Agents
-from schemas import CreateAgentRequest, Token
+import tokens
+from database import get_db
+from models import Agents, RefreshTokens
+from passwords import hash_password, verify_password
+from schemas import CreateAgentRequest, RefreshTokenRequest, Token
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"],
 )
-load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 
-def authenticate_agent(username: str, password: str, db):
-    agent = db.query(Agents).filter(Agents.username == username).first()
+async def authenticate_agent(username: str, password: str, db):
+    agent = await db.scalar(select(Agents).where(Agents.username == username))
     if not agent:
         return False
-    if not bcrypt_context.verify(password, agent.hashed_password):
+    if not await verify_password(password, agent.hashed_password):
         return False
     return agent
 
 
 def create_access_token(
-    username: str, agent_id: str, role: str, expires_delta: timedelta
+    username: str, agent_id: str, role: str, expires_delta: timedelta | None = None
 ):
-    encode = {"sub": username, "id": agent_id, "role": role}
-    expires = datetime.now(timezone.utc) + expires_delta
-    encode.update({"exp": expires})
-    return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
+    return tokens.create_access_token(
+        {"sub": username, "id": agent_id, "role": role}, expires_delta
+    )
+
+
+async def issue_tokens(db, agent, family_id: uuid.UUID | None = None) -> dict:
+    refresh_token, token_hash = tokens.new_refresh_token()
+    db.add(
+        RefreshTokens(
+            agent_id=agent.id,
+            family_id=family_id or uuid.uuid4(),
+            token_hash=token_hash,
+            expires_at=tokens.refresh_expiry(),
+        )
+    )
+    await db.commit()
+    return {
+        "access_token": create_access_token(
+            agent.username, str(agent.id), agent.role.value
+        ),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": tokens.ACCESS_TOKEN_MINUTES * 60,
+    }
+
+
+async def revoke_family(db, family_id: uuid.UUID):
+    await db.execute(
+        update(RefreshTokens)
+        .where(RefreshTokens.family_id == family_id, RefreshTokens.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
 
 
 async def get_current_agent(token: Annotated[str, Depends(oauth2_bearer)]):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = tokens.decode_access_token(token)
         username: str = payload.get("sub")
         agent_id: str = payload.get("id")
         agent_role: str = payload.get("role")
@@ -78,28 +96,80 @@ async def get_current_agent(token: Annotated[str, Depends(oauth2_bearer)]):
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_agent(db: db_dependency, create_agent_request: CreateAgentRequest):
+    hashed_password = await hash_password(create_agent_request.password)
     create_agent_model = Agents(
         name=create_agent_request.name,
         email=create_agent_request.email,
         username=create_agent_request.username,
-        hashed_password=bcrypt_context.hash(create_agent_request.password),
+        hashed_password=hashed_password,
         phone=create_agent_request.phone,
         role=create_agent_request.role,
     )
 
     db.add(create_agent_model)
-    db.commit()
+    await db.commit()
 
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: db_dependency
 ):
-    agent = authenticate_agent(form_data.username, form_data.password, db)
+    agent = await authenticate_agent(form_data.username, form_data.password, db)
     if not agent:
-        return "Failed authentication"
-    token = create_access_token(
-        agent.username, str(agent.id), str(agent.role), timedelta(minutes=20)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Failed authentication"
+        )
+    return await issue_tokens(db, agent)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(db: db_dependency, refresh_request: RefreshTokenRequest):
+    now = datetime.now(timezone.utc)
+    refresh_model = await db.scalar(
+        select(RefreshTokens).where(
+            RefreshTokens.token_hash
+            == tokens.hash_refresh_token(refresh_request.refresh_token),
+            RefreshTokens.expires_at > now,
+        )
     )
+    if refresh_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    consumed = await db.execute(
+        update(RefreshTokens)
+        .where(RefreshTokens.id == refresh_model.id, RefreshTokens.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if consumed.rowcount != 1:
+        await revoke_family(db, refresh_model.family_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    agent = await db.get(Agents, refresh_model.agent_id)
+    if agent is None or not agent.is_active:
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+    return await issue_tokens(db, agent, refresh_model.family_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_refresh_token(db: db_dependency, refresh_request: RefreshTokenRequest):
+    refresh_model = await db.scalar(
+        select(RefreshTokens).where(
+            RefreshTokens.token_hash
+            == tokens.hash_refresh_token(refresh_request.refresh_token)
+        )
+    )
+    if refresh_model is not None:
+        await revoke_family(db, refresh_model.family_id)
+
 
-    return {"access_token": token, "token_type": "bearer"}
+@router.get("/jwks", status_code=status.HTTP_200_OK)
+async def read_jwks():
+    return tokens.public_jwks()
@@ -1,12 +1,18 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from database import SessionLocal
+import batch
+import http_cache
+import pagination
+from cache import cache
+from database import ReadSessionLocal, get_db
 from models import Cities
-from schemas import CityRequest
+from schemas import CityBatchRequest, CityRequest, CityResponse, Page
 from utils import convert_to_uuid
 
 from .auth import get_current_agent
@@ -17,29 +23,52 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
-agent_dependency = Annotated[dict, Depends(get_current_agent)]
+CITY_COLUMNS = pagination.response_columns(Cities, CityResponse)
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[CityResponse])
+async def read_all(
+    request: Request,
+    db: db_dependency,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    stream: bool = False,
+):
+    if stream:
+        return StreamingResponse(
+            pagination.stream_ndjson(ReadSessionLocal, Cities, cursor),
+            media_type="application/x-ndjson",
+        )
 
+    async def load_page():
+        page = (
+            Page[CityResponse]
+            .model_validate(
+                await pagination.paginate_rows(db, Cities, CITY_COLUMNS, limit, cursor)
+            )
+            .model_dump(mode="json")
+        )
+        return {"etag": http_cache.content_etag(page), "body": page}
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def read_all(db: db_dependency):
-    return db.query(Cities).all()
+    cached = await cache.get_or_load("cities", f"list:{limit}:{cursor}", load_page)
+    return http_cache.conditional_response(request, cached["etag"], cached["body"])
 
 
-@router.get("/{city_id}", status_code=status.HTTP_200_OK)
-async def read_city(db: db_dependency, city_id: str):
-    city_model = db.query(Cities).filter(Cities.id == convert_to_uuid(city_id)).first()
+@router.get("/{city_id}", status_code=status.HTTP_200_OK, response_model=CityResponse)
+async def read_city(request: Request, db: db_dependency, city_id: str):
+    city_model = await db.scalar(
+        select(Cities).where(Cities.id == convert_to_uuid(city_id))
+    )
 
     if city_model is not None:
-        return city_model
+        body = CityResponse.model_validate(city_model).model_dump(mode="json")
+        return http_cache.conditional_response(
+            request, http_cache.content_etag(body), body
+        )
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="City not found")
 
 
@@ -53,29 +82,62 @@ async def create_city(
         )
     city_model = Cities(**city_request.dict())
     db.add(city_model)
-    db.commit()
+    await db.commit()
+    await cache.invalidate("cities")
+
+
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def batch_cities(
+    agent: agent_dependency, db: db_dependency, batch_request: CityBatchRequest
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    batch.check_batch_size(batch_request)
+
+    existing = await batch.existing_rows(
+        db, Cities, [item.id for item in batch_request.update] + batch_request.delete
+    )
+    results = await batch.apply_batch(
+        db,
+        Cities,
+        [city_request.model_dump() for city_request in batch_request.create],
+        [item.model_dump() for item in batch_request.update],
+        batch_request.delete,
+        existing,
+    )
+    await db.commit()
+    await cache.invalidate("cities")
+    return {"results": results}
 
 
 @router.put("/{city_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_city(db: db_dependency, city_request: CityRequest, city_id: str):
-    city_model = db.query(Cities).filter(Cities.id == convert_to_uuid(city_id)).first()
+    city_model = await db.scalar(
+        select(Cities).where(Cities.id == convert_to_uuid(city_id))
+    )
     if city_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="City not found"
         )
-        city_model.city = city_request.city
+    city_model.city = city_request.city
 
-        db.add(city_model)
-        db.commit()
+    db.add(city_model)
+    await db.commit()
+    await cache.invalidate("cities")
 
 
 @router.delete("/{city_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_city(db: db_dependency, city_id: str):
-    city_model = db.query(Cities).filter(Cities.id == convert_to_uuid(city_id)).first()
+    city_model = await db.scalar(
+        select(Cities).where(Cities.id == convert_to_uuid(city_id))
+    )
     if city_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="City not found"
         )
-    db.query(Cities).filter(Cities.id == city_id).delete()
+    await db.execute(delete(Cities).where(Cities.id == city_model.id))
 
-    db.commit()
+    await db.commit()
+    await cache.invalidate("cities")
@@ -0,0 +1,47 @@
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette import status
+
+from database import async_engine, pool_metrics, replicas
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+
+@router.get("/", status_code=status.HTTP_200_OK)
+async def read_health():
+    return {"status": "ok"}
+
+
+@router.get("/db", status_code=status.HTTP_200_OK)
+async def read_db_health():
+    engines = {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    start = time.perf_counter()
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as error:
+        if isinstance(error, PoolTimeoutError):
+            pool_metrics["async"].timeouts += 1
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "unavailable",
+                "error": type(error).__name__,
+                "engines": engines,
+                "replicas": replicas.status(),
+            },
+        )
+    return {
+        "status": "ok",
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        "engines": engines,
+        "replicas": replicas.status(),
+    }
@@ -0,0 +1,137 @@
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Form,
+    HTTPException,
+    UploadFile,
+)
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+import imaging
+import jobs
+from config import ImageStatus
+from database import get_db
+from models import PropertieImages, Properties
+from schemas import PropertyImageResponse
+from utils import convert_to_uuid
+
+from .auth import get_current_agent
+
+router = APIRouter(
+    prefix="/images",
+    tags=["images"],
+)
+
+
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
+
+
+async def owned_property(db, agent: dict, property_id) -> Properties:
+    property_model = await db.scalar(
+        select(Properties)
+        .where(Properties.id == property_id)
+        .where(Properties.agent_id == convert_to_uuid(agent.get("id")))
+    )
+    if property_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
+        )
+    return property_model
+
+
+@router.get(
+    "/property/{property_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=list[PropertyImageResponse],
+)
+async def read_property_images(db: db_dependency, property_id: str):
+    return (
+        await db.scalars(
+            select(PropertieImages).where(
+                PropertieImages.property_id == convert_to_uuid(property_id)
+            )
+        )
+    ).all()
+
+
+@router.get(
+    "/{image_id}", status_code=status.HTTP_200_OK, response_model=PropertyImageResponse
+)
+async def read_image(db: db_dependency, image_id: str):
+    image_model = await db.get(PropertieImages, convert_to_uuid(image_id))
+    if image_model is not None:
+        return image_model
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+
+@router.post(
+    "/property/{property_id}",
+    status_code=status.HTTP_201_CREATED,
+    response_model=PropertyImageResponse,
+)
+async def upload_image(
+    agent: agent_dependency,
+    db: db_dependency,
+    property_id: str,
+    file: UploadFile,
+    is_thimbnail: Annotated[bool, Form()] = False,
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    property_model = await owned_property(db, agent, convert_to_uuid(property_id))
+
+    original = await imaging.store_original(file)
+    image_model = await db.scalar(
+        select(PropertieImages)
+        .where(PropertieImages.property_id == property_model.id)
+        .where(PropertieImages.content_hash == original["content_hash"])
+    )
+    if image_model is None:
+        image_model = PropertieImages(
+            **original,
+            property_id=property_model.id,
+            is_thimbnail=is_thimbnail,
+            status=ImageStatus.PENDIENTE,
+        )
+        db.add(image_model)
+        await db.flush()
+        await jobs.enqueue(
+            db,
+            "images.variants",
+            {"image_id": image_model.id},
+            priority=jobs.PRIORITY_HIGH,
+            idempotency_key=f"images.variants:{image_model.id}",
+            agent_id=property_model.agent_id,
+        )
+        await db.commit()
+    return image_model
+
+
+@router.delete("/{image_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_image(agent: agent_dependency, db: db_dependency, image_id: str):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    image_model = await db.get(PropertieImages, convert_to_uuid(image_id))
+    if image_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Image not found"
+        )
+    await owned_property(db, agent, image_model.property_id)
+
+    await db.execute(
+        delete(PropertieImages).where(PropertieImages.id == image_model.id)
+    )
+    if image_model.content_hash is not None:
+        await jobs.enqueue_image_cleanup(
+            db, [[image_model.content_hash, image_model.storage_key]]
+        )
+    await db.commit()
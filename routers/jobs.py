@@ -0,0 +1,94 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+import config
+import jobs
+import pagination
+from config import JobStatus
+from database import get_db
+from models import Jobs
+from schemas import JobResponse, Page
+from utils import convert_to_uuid
+
+from .auth import get_current_agent
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+)
+
+
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
+
+
+def is_admin(agent: dict) -> bool:
+    return agent.get("role") == config.RoleUser.ADMIN
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[JobResponse])
+async def read_jobs(
+    agent: agent_dependency,
+    db: db_dependency,
+    job_status: JobStatus | None = Query(None, alias="status"),
+    kind: str | None = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    statement = select(Jobs)
+    if not is_admin(agent):
+        statement = statement.where(Jobs.agent_id == convert_to_uuid(agent.get("id")))
+    if job_status is not None:
+        statement = statement.where(Jobs.status == job_status)
+    if kind is not None:
+        statement = statement.where(Jobs.kind == kind)
+
+    page = await pagination.paginate(db, Jobs, limit, cursor, statement=statement)
+    page["items"] = [jobs.job_summary(job) for job in page["items"]]
+    return page
+
+
+@router.get("/{job_id}", status_code=status.HTTP_200_OK, response_model=JobResponse)
+async def read_job(agent: agent_dependency, db: db_dependency, job_id: str):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    job = await db.get(Jobs, convert_to_uuid(job_id))
+    if job is None or not (is_admin(agent) or str(job.agent_id) == agent.get("id")):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return jobs.job_summary(job)
+
+
+@router.post("/{job_id}/retry", status_code=status.HTTP_202_ACCEPTED)
+async def retry_job(agent: agent_dependency, db: db_dependency, job_id: str):
+    if agent is None or not is_admin(agent):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    retried = await db.execute(
+        update(Jobs)
+        .where(Jobs.id == convert_to_uuid(job_id), Jobs.status == JobStatus.FALLIDO)
+        .values(
+            status=JobStatus.EN_COLA,
+            attempts=0,
+            run_at=jobs.utcnow(),
+            finished_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if retried.rowcount != 1:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Failed job not found"
+        )
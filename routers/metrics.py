@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from starlette import status
+
+import metrics
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK, include_in_schema=False)
+async def read_metrics():
+    content, media_type = metrics.render()
+    return Response(content=content, media_type=media_type)
@@ -0,0 +1,123 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+import pagination
+from cache import cache
+from database import get_db
+from models import PropertieOptions
+from schemas import OptionRequest, OptionResponse, Page
+from utils import convert_to_uuid
+
+from .auth import get_current_agent
+
+router = APIRouter(
+    prefix="/options",
+    tags=["options"],
+)
+
+
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
+
+
+OPTION_COLUMNS = pagination.response_columns(PropertieOptions, OptionResponse)
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[OptionResponse])
+async def read_all(
+    db: db_dependency,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+):
+    return await cache.get_or_load(
+        "options",
+        f"list:{limit}:{cursor}",
+        lambda: pagination.paginate_rows(
+            db, PropertieOptions, OPTION_COLUMNS, limit, cursor
+        ),
+    )
+
+
+@router.get(
+    "/{option_id}", status_code=status.HTTP_200_OK, response_model=OptionResponse
+)
+async def read_option(db: db_dependency, option_id: str):
+    option_model = await db.scalar(
+        select(PropertieOptions).where(
+            PropertieOptions.id == convert_to_uuid(option_id)
+        )
+    )
+
+    if option_model is not None:
+        return option_model
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Option not found"
+    )
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_option(
+    agent: agent_dependency, db: db_dependency, option_request: OptionRequest
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    option_model = PropertieOptions(**option_request.model_dump())
+    db.add(option_model)
+    await db.commit()
+    await cache.invalidate("options")
+
+
+@router.put("/{option_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def update_option(
+    agent: agent_dependency,
+    db: db_dependency,
+    option_request: OptionRequest,
+    option_id: str,
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    option_model = await db.scalar(
+        select(PropertieOptions).where(
+            PropertieOptions.id == convert_to_uuid(option_id)
+        )
+    )
+    if option_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Option not found"
+        )
+    option_model.name = option_request.name
+
+    db.add(option_model)
+    await db.commit()
+    await cache.invalidate("options")
+
+
+@router.delete("/{option_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_option(agent: agent_dependency, db: db_dependency, option_id: str):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    option_model = await db.scalar(
+        select(PropertieOptions).where(
+            PropertieOptions.id == convert_to_uuid(option_id)
+        )
+    )
+    if option_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Option not found"
+        )
+    await db.execute(
+        delete(PropertieOptions).where(PropertieOptions.id == option_model.id)
+    )
+
+    await db.commit()
+    await cache.invalidate("options")
@@ -1,12 +1,65 @@
+from datetime import datetime, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from starlette import status
 
-from database import SessionLocal
-from models import Properties
-from schemas import PropertyRequest
+import batch
+import bulk
+import changes
+import fulltext
+import geo
+import http_cache
+import imaging
+import jobs
+import pagination
+import similarity
+import stats
+from config import (
+    ChangeOperation,
+    ImportFormat,
+    ImportStatus,
+    PropertiesSort,
+    PropertiesStatus,
+    PropertiesType,
+    SortOrder,
+)
+from database import ReadSessionLocal, get_db
+from models import (
+    Addresses,
+    ImportJobs,
+    PropertieAssignedOptions,
+    PropertieImages,
+    Properties,
+    SimilarProperties,
+)
+from responses import ORJSONResponse
+from schemas import (
+    ImportJobResponse,
+    Page,
+    PropertyBatchRequest,
+    PropertyChangeResponse,
+    PropertyFullResponse,
+    PropertyListItemResponse,
+    PropertyNearbyResponse,
+    PropertyRequest,
+    PropertyResponse,
+    PropertySimilarResponse,
+    PropertyViewportResponse,
+)
 from utils import convert_to_uuid
 
 from .auth import get_current_agent
@@ -17,29 +70,485 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+handler_db_dependency = Annotated[AsyncSession, Depends(get_db, scope="function")]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
 
+FULL_LOAD_OPTIONS = (
+    joinedload(Properties.address).joinedload(Addresses.city),
+    joinedload(Properties.address).joinedload(Addresses.state),
+    joinedload(Properties.agent),
+    selectinload(Properties.images),
+    selectinload(Properties.options),
+)
 
-db_dependency = Annotated[Session, Depends(get_db)]
-agent_dependency = Annotated[dict, Depends(get_current_agent)]
+PROPERTY_COLUMNS = pagination.response_columns(Properties, PropertyResponse)
+PROPERTY_VIRTUAL_FIELDS = ("thumbnail",)
+
+SORT_COLUMNS = {
+    PropertiesSort.ID: None,
+    PropertiesSort.PRECIO: Properties.price,
+    PropertiesSort.TAMANO: Properties.size,
+}
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def read_all(db: db_dependency):
-    return db.query(Properties).all()
+def property_fields(fields: str | None):
+    return pagination.parse_fields(fields, PropertyResponse, PROPERTY_VIRTUAL_FIELDS)
 
 
-@router.get("/{property_id}", status_code=status.HTTP_200_OK)
-async def read_property(db: db_dependency, property_id: str):
-    property_model = (
-        db.query(Properties)
-        .filter(Properties.id == convert_to_uuid(property_id))
-        .first()
+def property_columns(names: list | None, *required) -> list:
+    if names is None:
+        return PROPERTY_COLUMNS
+    return pagination.field_columns(
+        Properties,
+        [*required, *(name for name in names if name not in PROPERTY_VIRTUAL_FIELDS)],
+    )
+
+
+async def load_thumbnails(db, property_ids: list) -> dict:
+    rows = await db.execute(
+        select(
+            PropertieImages.property_id,
+            PropertieImages.thumbnail_url,
+            PropertieImages.image_url,
+        )
+        .where(PropertieImages.property_id.in_(property_ids))
+        .order_by(PropertieImages.is_thimbnail.desc(), PropertieImages.created_at)
+    )
+    thumbnails = {}
+    for property_id, thumbnail_url, image_url in rows:
+        thumbnails.setdefault(property_id, thumbnail_url or image_url)
+    return thumbnails
+
+
+async def project_items(db, items: list, names: list) -> list:
+    thumbnails = {}
+    if "thumbnail" in names:
+        thumbnails = await load_thumbnails(db, [item["id"] for item in items])
+    return [
+        {
+            name: thumbnails.get(item["id"]) if name == "thumbnail" else item[name]
+            for name in names
+        }
+        for item in items
+    ]
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[PropertyResponse])
+async def read_all(
+    request: Request,
+    db: handler_db_dependency,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: PropertiesSort = PropertiesSort.ID,
+    order: SortOrder = SortOrder.ASC,
+    stream: bool = False,
+    expand: bool = False,
+    fields: str | None = None,
+):
+    sort_column = SORT_COLUMNS[sort]
+    names = property_fields(fields)
+    if names is not None and (expand or stream):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fields cannot be combined with expand or stream",
+        )
+    if expand:
+        page = await pagination.paginate(
+            db,
+            Properties,
+            limit,
+            cursor,
+            sort_column,
+            order,
+            select(Properties).options(*FULL_LOAD_OPTIONS),
+        )
+        page["items"] = [
+            PropertyListItemResponse.model_validate(property_model)
+            for property_model in page["items"]
+        ]
+        return ORJSONResponse(page)
+    if stream:
+        return StreamingResponse(
+            pagination.stream_ndjson(
+                ReadSessionLocal, Properties, cursor, sort_column, order
+            ),
+            media_type="application/x-ndjson",
+        )
+    columns = property_columns(names, "id", "version", sort.value)
+    page = await pagination.paginate_rows(
+        db, Properties, columns, limit, cursor, sort_column, order
+    )
+    versions = [f"{item['id']}:{item['version']}" for item in page["items"]]
+    if names is not None:
+        page["items"] = await project_items(db, page["items"], names)
+        versions.extend(item.get("thumbnail") for item in page["items"])
+    etag = http_cache.make_etag(fields, page["next_cursor"], *versions)
+    return http_cache.conditional_response(request, etag, page)
+
+
+@router.get(
+    "/search", status_code=status.HTTP_200_OK, response_model=Page[PropertyResponse]
+)
+async def search_properties(
+    db: db_dependency,
+    q: str | None = Query(None, min_length=1, max_length=200),
+    type: PropertiesType | None = None,
+    property_status: PropertiesStatus | None = Query(None, alias="status"),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_size: float | None = Query(None, ge=0),
+    max_size: float | None = Query(None, ge=0),
+    min_bedrooms: int | None = Query(None, ge=0),
+    min_bathrooms: int | None = Query(None, ge=0),
+    city_id: str | None = None,
+    state_id: str | None = None,
+    agent_id: str | None = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: PropertiesSort = PropertiesSort.PRECIO,
+    order: SortOrder = SortOrder.ASC,
+    fields: str | None = None,
+):
+    names = property_fields(fields)
+    columns = property_columns(names, "id", sort.value)
+    statement = select(Properties) if names is None else select(*columns)
+    if type is not None:
+        statement = statement.where(Properties.type == type)
+    if property_status is not None:
+        statement = statement.where(Properties.status == property_status)
+    if min_price is not None:
+        statement = statement.where(Properties.price >= min_price)
+    if max_price is not None:
+        statement = statement.where(Properties.price <= max_price)
+    if min_size is not None:
+        statement = statement.where(Properties.size >= min_size)
+    if max_size is not None:
+        statement = statement.where(Properties.size <= max_size)
+    if min_bedrooms is not None:
+        statement = statement.where(Properties.bedrooms >= min_bedrooms)
+    if min_bathrooms is not None:
+        statement = statement.where(Properties.bathrooms >= min_bathrooms)
+    if agent_id is not None:
+        statement = statement.where(Properties.agent_id == convert_to_uuid(agent_id))
+    if city_id is not None or state_id is not None:
+        statement = statement.join(Addresses, Properties.address_id == Addresses.id)
+        if city_id is not None:
+            statement = statement.where(Addresses.city_id == convert_to_uuid(city_id))
+        if state_id is not None:
+            statement = statement.where(Addresses.state_id == convert_to_uuid(state_id))
+
+    if q is not None:
+        statement, rank = fulltext.apply_fulltext(
+            statement, db.get_bind().dialect.name, q
+        )
+        page = await pagination.paginate_ranked(
+            db, statement, rank, limit, cursor, rows=names is not None
+        )
+    elif names is None:
+        page = await pagination.paginate(
+            db, Properties, limit, cursor, SORT_COLUMNS[sort], order, statement
+        )
+    else:
+        page = await pagination.paginate_rows(
+            db, Properties, columns, limit, cursor, SORT_COLUMNS[sort], order, statement
+        )
+
+    if names is None:
+        return page
+    page["items"] = await project_items(db, page["items"], names)
+    return ORJSONResponse(page)
+
+
+@router.get(
+    "/nearby",
+    status_code=status.HTTP_200_OK,
+    response_model=list[PropertyNearbyResponse],
+)
+async def read_nearby(
+    db: db_dependency,
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=geo.MAX_RADIUS_KM),
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+):
+    clause = geo.viewport_clause(Properties, *geo.bbox_around(lat, lng, radius_km))
+    candidates = await db.execute(
+        select(Properties.id, Properties.latitude, Properties.longitude).where(clause)
+    )
+    distances = {}
+    for property_id, latitude, longitude in candidates:
+        distance = geo.haversine_km(lat, lng, latitude, longitude)
+        if distance <= radius_km:
+            distances[property_id] = distance
+    nearest = sorted(distances, key=distances.get)[:limit]
+
+    property_models = await db.scalars(
+        select(Properties).where(Properties.id.in_(nearest))
+    )
+    items = [
+        {
+            **pagination.model_to_dict(property_model),
+            "distance_km": round(distances[property_model.id], 3),
+        }
+        for property_model in property_models
+    ]
+    return sorted(items, key=lambda item: item["distance_km"])
+
+
+@router.get(
+    "/viewport",
+    status_code=status.HTTP_200_OK,
+    response_model=PropertyViewportResponse,
+)
+async def read_viewport(
+    db: db_dependency,
+    min_lat: float = Query(ge=-90, le=90),
+    min_lng: float = Query(ge=-180, le=180),
+    max_lat: float = Query(ge=-90, le=90),
+    max_lng: float = Query(ge=-180, le=180),
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+):
+    if min_lat > max_lat:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid viewport"
+        )
+    clause = geo.viewport_clause(Properties, min_lat, min_lng, max_lat, max_lng)
+    count = await db.scalar(select(func.count(Properties.id)).where(clause))
+    if count <= limit:
+        items = (await db.scalars(select(Properties).where(clause))).all()
+        return {"count": count, "items": items, "clusters": []}
+
+    precision = min(
+        geo.cover_bbox(*box)[0]
+        for box in geo.split_viewport(min_lat, min_lng, max_lat, max_lng)
+    )
+    cell = func.substr(Properties.geohash, 1, precision + 1)
+    clusters = await db.execute(
+        select(
+            cell,
+            func.count(Properties.id),
+            func.avg(Properties.latitude),
+            func.avg(Properties.longitude),
+        )
+        .where(clause)
+        .group_by(cell)
+    )
+    return {
+        "count": count,
+        "items": [],
+        "clusters": [
+            {
+                "geohash": geohash,
+                "count": cluster_count,
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+            for geohash, cluster_count, latitude, longitude in clusters
+        ],
+    }
+
+
+async def check_change_cursor(db, since: str | None):
+    if await changes.cursor_expired(db, since):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Change cursor expired, resynchronize from /properties/export",
+        )
+
+
+@router.get(
+    "/changes",
+    status_code=status.HTTP_200_OK,
+    response_model=Page[PropertyChangeResponse],
+)
+async def read_changes(
+    request: Request,
+    db: db_dependency,
+    since: str | None = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    expand: bool = False,
+):
+    await check_change_cursor(db, since)
+    page = await changes.read_changes(
+        db, since, limit, PROPERTY_COLUMNS if expand else None
+    )
+    etag = http_cache.make_etag(
+        since,
+        limit,
+        page["next_cursor"],
+        await changes.latest_cursor(db) if expand else None,
+    )
+    return http_cache.conditional_response(request, etag, page, "no-cache")
+
+
+@router.get("/changes/stream", status_code=status.HTTP_200_OK)
+async def stream_changes(
+    request: Request,
+    since: str | None = None,
+    expand: bool = False,
+):
+    if since is None:
+        since = request.headers.get("last-event-id") or None
+    async with ReadSessionLocal() as db:
+        await check_change_cursor(db, since)
+    return StreamingResponse(
+        changes.stream_events(since, PROPERTY_COLUMNS if expand else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_properties(
+    export_format: ImportFormat = Query(ImportFormat.NDJSON, alias="format"),
+    agent_id: str | None = None,
+):
+    async with ReadSessionLocal() as db:
+        change_cursor = await changes.latest_cursor(db)
+    headers = {"X-Change-Cursor": change_cursor} if change_cursor else {}
+    if export_format == ImportFormat.CSV:
+        statement = select(
+            *(getattr(Properties, column) for column in bulk.EXPORT_COLUMNS)
+        )
+    else:
+        statement = select(Properties)
+    if agent_id is not None:
+        statement = statement.where(Properties.agent_id == convert_to_uuid(agent_id))
+
+    if export_format == ImportFormat.CSV:
+        return StreamingResponse(
+            bulk.stream_csv(
+                ReadSessionLocal,
+                statement.order_by(Properties.id),
+                pagination.STREAM_CHUNK_SIZE,
+            ),
+            media_type="text/csv",
+            headers=headers,
+        )
+    return StreamingResponse(
+        pagination.stream_ndjson(ReadSessionLocal, Properties, statement=statement),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
+@router.get(
+    "/import/{job_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ImportJobResponse,
+)
+async def read_import(agent: agent_dependency, db: db_dependency, job_id: str):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    job = await db.scalar(
+        select(ImportJobs)
+        .where(ImportJobs.id == convert_to_uuid(job_id))
+        .where(ImportJobs.agent_id == convert_to_uuid(agent.get("id")))
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Import not found"
+        )
+    return bulk.job_summary(job)
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ImportJobResponse,
+)
+async def import_properties(
+    agent: agent_dependency,
+    db: db_dependency,
+    file: UploadFile,
+    import_format: ImportFormat | None = Query(None, alias="format"),
+    job_id: str | None = None,
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    agent_id = convert_to_uuid(agent.get("id"))
+    if job_id is not None:
+        job = await db.scalar(
+            select(ImportJobs)
+            .where(ImportJobs.id == convert_to_uuid(job_id))
+            .where(ImportJobs.agent_id == agent_id)
+        )
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Import not found"
+            )
+    else:
+        job = ImportJobs(
+            agent_id=agent_id,
+            format=import_format
+            or bulk.detect_format(file.filename, file.content_type),
+        )
+        db.add(job)
+        await db.commit()
+
+    rows_imported = job.rows_imported
+    await bulk.import_file(db, job, file.file)
+    if job.status == ImportStatus.FALLIDA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=jsonable_encoder(bulk.job_summary(job)),
+        )
+    if job.rows_imported > rows_imported:
+        await jobs.enqueue(
+            db,
+            "similarity.rebuild",
+            priority=jobs.PRIORITY_LOW,
+            idempotency_key=f"similarity.rebuild:import:{job.id}:{job.rows_imported}",
+            agent_id=agent_id,
+        )
+        await db.commit()
+    return bulk.job_summary(job)
+
+
+@router.get(
+    "/{property_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=PropertyResponse,
+)
+async def read_property(
+    request: Request, db: db_dependency, property_id: str, fields: str | None = None
+):
+    names = property_fields(fields)
+    row = (
+        await db.execute(
+            select(*property_columns(names, "id", "version")).where(
+                Properties.id == convert_to_uuid(property_id)
+            )
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
+        )
+    item = row._asdict()
+    if names is None:
+        etag = http_cache.make_etag(item["id"], item["version"])
+        return http_cache.conditional_response(request, etag, item)
+    item = (await project_items(db, [item], names))[0]
+    etag = http_cache.make_etag(fields, row.id, row.version, item.get("thumbnail"))
+    return http_cache.conditional_response(request, etag, item)
+
+
+@router.get(
+    "/{property_id}/full",
+    status_code=status.HTTP_200_OK,
+    response_model=PropertyFullResponse,
+)
+async def read_property_full(db: db_dependency, property_id: str):
+    property_model = await db.scalar(
+        select(Properties)
+        .options(*FULL_LOAD_OPTIONS)
+        .where(Properties.id == convert_to_uuid(property_id))
     )
     if property_model is not None:
         return property_model
@@ -48,9 +557,34 @@ async def read_property(db: db_dependency, property_id: str):
     )
 
 
+@router.get(
+    "/{property_id}/similar",
+    status_code=status.HTTP_200_OK,
+    response_model=list[PropertySimilarResponse],
+)
+async def read_similar(
+    db: db_dependency,
+    property_id: str,
+    limit: int = Query(similarity.SIMILAR_TOP_K, ge=1, le=similarity.SIMILAR_TOP_K),
+):
+    rows = await db.execute(
+        select(Properties, SimilarProperties.score)
+        .join(SimilarProperties, SimilarProperties.similar_property_id == Properties.id)
+        .where(SimilarProperties.property_id == convert_to_uuid(property_id))
+        .order_by(SimilarProperties.rank)
+        .limit(limit)
+    )
+    return [
+        {**pagination.model_to_dict(property_model), "score": score}
+        for property_model, score in rows
+    ]
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_property(
-    agent: agent_dependency, db: db_dependency, property_request: PropertyRequest
+    agent: agent_dependency,
+    db: db_dependency,
+    property_request: PropertyRequest,
 ):
     if agent is None:
         raise HTTPException(
@@ -59,8 +593,101 @@ async def create_property(
     property_model = Properties(
         **property_request.model_dump(), agent_id=convert_to_uuid(agent.get("id"))
     )
+    geo.apply_location(property_model)
     db.add(property_model)
-    db.commit()
+    await db.flush()
+    await stats.record_changes(db, [], await stats.snapshot(db, [property_model.id]))
+    await changes.record(
+        db, ChangeOperation.CREACION, [property_model.id], property_model.agent_id
+    )
+    await jobs.enqueue_similarity_refresh(
+        db,
+        [property_model.id],
+        idempotency_key=f"similarity.refresh:{property_model.id}:{property_model.version}",
+        agent_id=property_model.agent_id,
+    )
+    await db.commit()
+
+
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def batch_properties(
+    agent: agent_dependency,
+    db: db_dependency,
+    batch_request: PropertyBatchRequest,
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    batch.check_batch_size(batch_request)
+    agent_id = convert_to_uuid(agent.get("id"))
+
+    existing = await batch.existing_rows(
+        db,
+        Properties,
+        [item.id for item in batch_request.update] + batch_request.delete,
+        Properties.agent_id == agent_id,
+    )
+    creates = [
+        bulk.property_values(property_request, agent_id)
+        for property_request in batch_request.create
+    ]
+    updates = []
+    for item in batch_request.update:
+        values = item.model_dump(exclude_unset=True)
+        if "map" in values:
+            location = geo.parse_map(values["map"])
+            values.update(
+                latitude=location[0] if location else None,
+                longitude=location[1] if location else None,
+                geohash=geo.encode_geohash(*location) if location else None,
+            )
+        values["updated_at"] = datetime.now(timezone.utc)
+        updates.append(values)
+    deletes = [item_id for item_id in batch_request.delete if item_id in existing]
+
+    referrers = await similarity.detach_properties(db, deletes)
+    blobs = await imaging.detach_images(db, deletes)
+    if deletes:
+        await db.execute(
+            delete(PropertieAssignedOptions).where(
+                PropertieAssignedOptions.property_id.in_(deletes)
+            )
+        )
+    before = await stats.snapshot(db, list(existing))
+    try:
+        results = await batch.apply_batch(
+            db, Properties, creates, updates, batch_request.delete, existing
+        )
+        await stats.record_changes(
+            db,
+            before,
+            await stats.snapshot(
+                db, [values["id"] for values in creates] + list(existing)
+            ),
+        )
+        await changes.record_results(db, results, agent_id)
+        await jobs.enqueue_similarity_refresh(
+            db,
+            [
+                result["id"]
+                for result in results
+                if result["op"] in ("create", "update") and result["status"] < 300
+            ],
+            agent_id=agent_id,
+        )
+        await jobs.enqueue_similarity_refresh(
+            db, referrers, include_neighbors=False, agent_id=agent_id
+        )
+        await jobs.enqueue_image_cleanup(db, blobs, agent_id=agent_id)
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A property was modified concurrently, retry the batch",
+        )
+    return {"results": results}
 
 
 @router.put("/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -75,53 +702,93 @@ async def update_property(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
 
-    property_model = (
-        db.query(Properties)
-        .filter(Properties.id == convert_to_uuid(property_id))
-        .filter(Properties.agent_id == convert_to_uuid(agent.get("id")))
-        .first()
+    property_model = await db.scalar(
+        select(Properties)
+        .where(Properties.id == convert_to_uuid(property_id))
+        .where(Properties.agent_id == convert_to_uuid(agent.get("id")))
     )
     if property_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
         )
-        property_model.address_id = property_request.address_id
-        property_model.type = property_request.type
-        property_model.price = property_request.price
-        property_model.status = property_request.status
-        property_model.agent_id = property_request.agent_id
-        property_model.title = property_request.title
-        property_model.subtitle = property_request.subtitle
-        property_model.size = property_request.size
-        property_model.bedrooms = property_request.bedrooms
-        property_model.rooms = property_request.rooms
-        property_model.bathrooms = property_request.bathrooms
-        property_model.description = property_request.description
-        property_model.video = property_request.video
-        property_model.map = property_request.map
-
-        db.add(property_model)
-        db.commit()
+    before = await stats.snapshot(db, [property_model.id])
+    property_model.address_id = property_request.address_id
+    property_model.type = property_request.type
+    property_model.price = property_request.price
+    property_model.status = property_request.status
+    property_model.title = property_request.title
+    property_model.subtitle = property_request.subtitle
+    property_model.size = property_request.size
+    property_model.bedrooms = property_request.bedrooms
+    property_model.rooms = property_request.rooms
+    property_model.bathrooms = property_request.bathrooms
+    property_model.description = property_request.description
+    property_model.video = property_request.video
+    property_model.map = property_request.map
+    geo.apply_location(property_model)
+
+    db.add(property_model)
+    try:
+        await db.flush()
+        await stats.record_changes(
+            db, before, await stats.snapshot(db, [property_model.id])
+        )
+        await changes.record(
+            db,
+            ChangeOperation.ACTUALIZACION,
+            [property_model.id],
+            property_model.agent_id,
+        )
+        await jobs.enqueue_similarity_refresh(
+            db,
+            [property_model.id],
+            idempotency_key=f"similarity.refresh:{property_model.id}:{property_model.version}",
+            agent_id=property_model.agent_id,
+        )
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The property was modified concurrently, retry the update",
+        )
 
 
 @router.delete("/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_property(agent: agent_dependency, db: db_dependency, property_id: str):
+async def delete_property(
+    agent: agent_dependency,
+    db: db_dependency,
+    property_id: str,
+):
     if agent is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
-    property_model = (
-        db.query(Properties)
-        .filter(Properties.id == convert_to_uuid(property_id))
-        .filter(Properties.agent_id == convert_to_uuid(agent.get("id")))
-        .first()
+    property_model = await db.scalar(
+        select(Properties)
+        .where(Properties.id == convert_to_uuid(property_id))
+        .where(Properties.agent_id == convert_to_uuid(agent.get("id")))
     )
     if property_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
         )
-    db.query(Properties).filter(Properties.id == property_id).filter(
-        Properties.agent_id == convert_to_uuid(agent.get("id"))
-    ).delete()
+    referrers = await similarity.detach_properties(db, [property_model.id])
+    blobs = await imaging.detach_images(db, [property_model.id])
+    await db.execute(
+        delete(PropertieAssignedOptions).where(
+            PropertieAssignedOptions.property_id == property_model.id
+        )
+    )
+    before = await stats.snapshot(db, [property_model.id])
+    await db.execute(delete(Properties).where(Properties.id == property_model.id))
+    await stats.record_changes(db, before, [])
+    await changes.record(
+        db, ChangeOperation.ELIMINACION, [property_model.id], property_model.agent_id
+    )
+    await jobs.enqueue_similarity_refresh(
+        db, referrers, include_neighbors=False, agent_id=property_model.agent_id
+    )
+    await jobs.enqueue_image_cleanup(db, blobs, agent_id=property_model.agent_id)
 
-    db.commit()
+    await db.commit()
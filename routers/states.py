@@ -1,12 +1,18 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from database import SessionLocal
+import batch
+import http_cache
+import pagination
+from cache import cache
+from database import ReadSessionLocal, get_db
 from models import States
-from schemas import StateRequest
+from schemas import Page, StateBatchRequest, StateRequest, StateResponse
 from utils import convert_to_uuid
 
 from .auth import get_current_agent
@@ -17,31 +23,52 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+agent_dependency = Annotated[dict, Depends(get_current_agent)]
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
-agent_dependency = Annotated[dict, Depends(get_current_agent)]
+STATE_COLUMNS = pagination.response_columns(States, StateResponse)
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[StateResponse])
+async def read_all(
+    request: Request,
+    db: db_dependency,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    stream: bool = False,
+):
+    if stream:
+        return StreamingResponse(
+            pagination.stream_ndjson(ReadSessionLocal, States, cursor),
+            media_type="application/x-ndjson",
+        )
 
+    async def load_page():
+        page = (
+            Page[StateResponse]
+            .model_validate(
+                await pagination.paginate_rows(db, States, STATE_COLUMNS, limit, cursor)
+            )
+            .model_dump(mode="json")
+        )
+        return {"etag": http_cache.content_etag(page), "body": page}
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def read_all(db: db_dependency):
-    return db.query(States).all()
+    cached = await cache.get_or_load("states", f"list:{limit}:{cursor}", load_page)
+    return http_cache.conditional_response(request, cached["etag"], cached["body"])
 
 
-@router.get("/{state_id}", status_code=status.HTTP_200_OK)
-async def read_state(db: db_dependency, state_id: str):
-    state_model = (
-        db.query(States).filter(States.id == convert_to_uuid(state_id)).first()
+@router.get("/{state_id}", status_code=status.HTTP_200_OK, response_model=StateResponse)
+async def read_state(request: Request, db: db_dependency, state_id: str):
+    state_model = await db.scalar(
+        select(States).where(States.id == convert_to_uuid(state_id))
     )
 
     if state_model is not None:
-        return state_model
+        body = StateResponse.model_validate(state_model).model_dump(mode="json")
+        return http_cache.conditional_response(
+            request, http_cache.content_etag(body), body
+        )
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
 
 
@@ -55,33 +82,62 @@ async def create_state(
         )
     state_model = States(**state_request.dict())
     db.add(state_model)
-    db.commit()
+    await db.commit()
+    await cache.invalidate("states")
+
+
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def batch_states(
+    agent: agent_dependency, db: db_dependency, batch_request: StateBatchRequest
+):
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    batch.check_batch_size(batch_request)
+
+    existing = await batch.existing_rows(
+        db, States, [item.id for item in batch_request.update] + batch_request.delete
+    )
+    results = await batch.apply_batch(
+        db,
+        States,
+        [state_request.model_dump() for state_request in batch_request.create],
+        [item.model_dump() for item in batch_request.update],
+        batch_request.delete,
+        existing,
+    )
+    await db.commit()
+    await cache.invalidate("states")
+    return {"results": results}
 
 
 @router.put("/{state_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_state(db: db_dependency, state_request: StateRequest, state_id: str):
-    state_model = (
-        db.query(States).filter(States.id == convert_to_uuid(state_id)).first()
+    state_model = await db.scalar(
+        select(States).where(States.id == convert_to_uuid(state_id))
     )
     if state_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="State not found"
         )
-        state_model.state = state_request.state
+    state_model.state = state_request.state
 
-        db.add(state_model)
-        db.commit()
+    db.add(state_model)
+    await db.commit()
+    await cache.invalidate("states")
 
 
 @router.delete("/{state_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_state(db: db_dependency, state_id: str):
-    state_model = (
-        db.query(States).filter(States.id == convert_to_uuid(state_id)).first()
+    state_model = await db.scalar(
+        select(States).where(States.id == convert_to_uuid(state_id))
     )
     if state_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="State not found"
         )
-    db.query(States).filter(States.id == state_id).delete()
+    await db.execute(delete(States).where(States.id == state_model.id))
 
-    db.commit()
+    await db.commit()
+    await cache.invalidate("states")
@@ -0,0 +1,84 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+import stats
+from config import PropertiesStatus, PropertiesType, StatsGroupBy
+from database import get_db
+from models import Cities, PropertyPriceHistogram, PropertyStats, States
+from schemas import StatsResponse
+from utils import convert_to_uuid
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+)
+
+
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+
+
+async def add_names(db, groups: list, column: StatsGroupBy, model, name_column):
+    ids = {group[column.value] for group in groups if group[column.value]}
+    if not ids:
+        return
+    names = dict(
+        (await db.execute(select(model.id, name_column).where(model.id.in_(ids)))).all()
+    )
+    for group in groups:
+        group[f"{column.value}_name"] = names.get(group[column.value])
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=StatsResponse,
+    response_model_exclude_unset=True,
+)
+async def read_stats(
+    db: db_dependency,
+    group_by: Annotated[list[StatsGroupBy], Query()] = [StatsGroupBy.ESTADO],
+    state_id: str | None = None,
+    city_id: str | None = None,
+    type: PropertiesType | None = None,
+    property_status: PropertiesStatus | None = Query(None, alias="status"),
+):
+    group_by = list(dict.fromkeys(group_by))
+    statement = select(PropertyStats)
+    if state_id is not None:
+        statement = statement.where(PropertyStats.state_id == convert_to_uuid(state_id))
+    if city_id is not None:
+        statement = statement.where(PropertyStats.city_id == convert_to_uuid(city_id))
+    if type is not None:
+        statement = statement.where(PropertyStats.type == type)
+    if property_status is not None:
+        statement = statement.where(PropertyStats.status == property_status)
+
+    stats_rows = (await db.scalars(statement)).all()
+    bucket_rows = (
+        await db.execute(
+            select(
+                PropertyPriceHistogram.group_key,
+                PropertyPriceHistogram.bucket,
+                PropertyPriceHistogram.count,
+            ).where(
+                PropertyPriceHistogram.group_key.in_(
+                    statement.with_only_columns(PropertyStats.group_key)
+                )
+            )
+        )
+    ).all()
+
+    groups = stats.summarize(stats_rows, bucket_rows, group_by)
+    if StatsGroupBy.ESTADO in group_by:
+        await add_names(db, groups, StatsGroupBy.ESTADO, States, States.state)
+    if StatsGroupBy.CIUDAD in group_by:
+        await add_names(db, groups, StatsGroupBy.CIUDAD, Cities, Cities.city)
+    return {
+        "group_by": group_by,
+        "total": sum(group["count"] for group in groups),
+        "groups": groups,
+    }
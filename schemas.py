@@ -1,9 +1,28 @@
-from typing import Optional
+import json
+from datetime import datetime
+from typing import Generic, Optional, TypeVar
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from config import PropertiesStatus, PropertiesType, RoleUser
+from config import (
+    ChangeOperation,
+    ImageStatus,
+    ImportFormat,
+    ImportStatus,
+    JobStatus,
+    PropertiesStatus,
+    PropertiesType,
+    RoleUser,
+    StatsGroupBy,
+)
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
 
 
 class PropertyRequest(BaseModel):
@@ -34,6 +53,12 @@ class CreateAgentRequest(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class StateRequest(BaseModel):
@@ -54,3 +79,327 @@ class AddressRequest(BaseModel):
     state_id: Optional[UUID]
     city_id: Optional[UUID]
     address: str
+
+
+class StateResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    state: str
+    is_active: bool
+
+
+class CityResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    city: str
+    state_id: Optional[UUID]
+    is_active: bool
+
+
+class AddressResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    address: str
+    state_id: Optional[UUID]
+    city_id: Optional[UUID]
+
+
+class AddressDetailResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    address: str
+    city: Optional[CityResponse]
+    state: Optional[StateResponse]
+
+
+class PropertyImageResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    image_url: str
+    is_thimbnail: bool
+    status: ImageStatus
+    width: Optional[int] = None
+    height: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+    variants: dict = {}
+
+    @field_validator("variants", mode="before")
+    @classmethod
+    def parse_variants(cls, value):
+        return json.loads(value) if isinstance(value, str) else value or {}
+
+
+class PropertyImageThumbnailResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    is_thimbnail: bool
+    status: ImageStatus
+    thumbnail_url: str
+
+    @model_validator(mode="before")
+    @classmethod
+    def fallback_to_original(cls, value):
+        if isinstance(value, dict):
+            return {
+                **value,
+                "thumbnail_url": value.get("thumbnail_url") or value.get("image_url"),
+            }
+        return {
+            "id": value.id,
+            "is_thimbnail": value.is_thimbnail,
+            "status": value.status,
+            "thumbnail_url": value.thumbnail_url or value.image_url,
+        }
+
+
+class PropertyOptionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+
+
+class OptionResponse(PropertyOptionResponse):
+    is_active: bool
+
+
+class AgentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    email: str
+    username: str
+    phone: str
+    role: RoleUser
+    is_active: bool
+
+
+class AgentPublicResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    email: str
+    phone: str
+
+
+class PropertyResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    address_id: Optional[UUID]
+    type: PropertiesType
+    price: float
+    status: PropertiesStatus
+    agent_id: Optional[UUID]
+    title: str
+    subtitle: str
+    size: float
+    bedrooms: int
+    rooms: int
+    bathrooms: int
+    description: str
+    video: Optional[str]
+    map: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    version: int
+    updated_at: datetime
+
+
+class PropertyFullResponse(PropertyResponse):
+    address: Optional[AddressDetailResponse]
+    agent: Optional[AgentPublicResponse]
+    images: list[PropertyImageResponse]
+    options: list[PropertyOptionResponse]
+
+
+class PropertyListItemResponse(PropertyFullResponse):
+    images: list[PropertyImageThumbnailResponse]
+
+
+class PropertyNearbyResponse(PropertyResponse):
+    distance_km: float
+
+
+class PropertySimilarResponse(PropertyResponse):
+    score: float
+
+
+class PropertyClusterResponse(BaseModel):
+    geohash: str
+    count: int
+    latitude: float
+    longitude: float
+
+
+class PropertyViewportResponse(BaseModel):
+    count: int
+    items: list[PropertyResponse]
+    clusters: list[PropertyClusterResponse]
+
+
+class PropertyChangeResponse(BaseModel):
+    cursor: str
+    property_id: UUID
+    operation: ChangeOperation
+    agent_id: Optional[UUID] = None
+    changed_at: datetime
+    property: Optional[PropertyResponse] = None
+
+
+class ImportErrorResponse(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ImportJobResponse(BaseModel):
+    id: UUID
+    status: ImportStatus
+    format: ImportFormat
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: list[ImportErrorResponse]
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    finished_at: Optional[datetime]
+    last_error: Optional[str]
+    payload: dict
+
+
+class StatsGroupResponse(BaseModel):
+    state: Optional[UUID] = None
+    state_name: Optional[str] = None
+    city: Optional[UUID] = None
+    city_name: Optional[str] = None
+    type: Optional[PropertiesType] = None
+    status: Optional[PropertiesStatus] = None
+    count: int
+    avg_price: Optional[float]
+    median_price: Optional[float]
+    avg_size: Optional[float]
+    avg_price_per_m2: Optional[float]
+
+
+class StatsResponse(BaseModel):
+    group_by: list[StatsGroupBy]
+    total: int
+    groups: list[StatsGroupResponse]
+
+
+class CheckoutWaitResponse(BaseModel):
+    samples: int
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+    max: float
+
+
+class SlowQueryResponse(BaseModel):
+    ms: float
+    statement: str
+
+
+class EngineStatsResponse(BaseModel):
+    pool: dict
+    connects: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+    timeouts: int
+    in_use: int
+    peak_in_use: int
+    checkout_wait_ms: CheckoutWaitResponse
+    queries: int
+    query_seconds: float
+    slow_queries: int
+    slow_query_threshold_ms: float
+    recent_slow_queries: list[SlowQueryResponse]
+
+
+class CacheCountersResponse(BaseModel):
+    local_hits: int
+    shared_hits: int
+    misses: int
+
+
+class CacheStatsResponse(BaseModel):
+    entries: int
+    max_entries: int
+    shared: bool
+    namespaces: dict[str, CacheCountersResponse]
+
+
+class OptionRequest(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+
+
+class PropertyBatchUpdate(BaseModel):
+    id: UUID
+    address_id: Optional[UUID] = None
+    type: Optional[PropertiesType] = None
+    price: Optional[float] = Field(None, ge=0)
+    status: Optional[PropertiesStatus] = None
+    title: Optional[str] = Field(None, min_length=1, max_length=100)
+    subtitle: Optional[str] = Field(None, min_length=1, max_length=100)
+    size: Optional[float] = Field(None, ge=0)
+    bedrooms: Optional[int] = Field(None, ge=0)
+    rooms: Optional[int] = Field(None, ge=0)
+    bathrooms: Optional[int] = Field(None, ge=0)
+    description: Optional[str] = Field(None, min_length=1)
+    video: Optional[str] = None
+    map: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        for field in self.model_fields_set - {"address_id", "video", "map"}:
+            if getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
+class PropertyBatchRequest(BaseModel):
+    create: list[PropertyRequest] = []
+    update: list[PropertyBatchUpdate] = []
+    delete: list[UUID] = []
+
+
+class StateBatchUpdate(StateRequest):
+    id: UUID
+
+
+class StateBatchRequest(BaseModel):
+    create: list[StateRequest] = []
+    update: list[StateBatchUpdate] = []
+    delete: list[UUID] = []
+
+
+class CityBatchUpdate(CityRequest):
+    id: UUID
+
+
+class CityBatchRequest(BaseModel):
+    create: list[CityRequest] = []
+    update: list[CityBatchUpdate] = []
+    delete: list[UUID] = []
+
+
+class PropertyBatchDelete(BaseModel):
+    delete: list[UUID] = Field(min_length=1)
@@ -0,0 +1,57 @@
+import argparse
+
+from sqlalchemy import select, update
+
+import geo
+from database import SessionLocal
+from models import Properties
+
+
+def backfill(batch_size: int, overwrite: bool = False) -> int:
+    updated = 0
+    last_id = None
+    with SessionLocal() as db:
+        while True:
+            statement = (
+                select(Properties.id, Properties.map, Properties.version)
+                .where(Properties.map.is_not(None))
+                .order_by(Properties.id)
+                .limit(batch_size)
+            )
+            if not overwrite:
+                statement = statement.where(Properties.latitude.is_(None))
+            if last_id is not None:
+                statement = statement.where(Properties.id > last_id)
+            rows = db.execute(statement).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            values = []
+            for property_id, map_value, version in rows:
+                location = geo.parse_map(map_value)
+                if location is not None:
+                    values.append(
+                        {
+                            "id": property_id,
+                            "version": version,
+                            "latitude": location[0],
+                            "longitude": location[1],
+                            "geohash": geo.encode_geohash(*location),
+                        }
+                    )
+            if values:
+                db.execute(update(Properties), values)
+                db.commit()
+                updated += len(values)
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Parse Properties.map into latitude, longitude and geohash"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+    print(f"Updated {backfill(args.batch_size, args.overwrite)} properties")
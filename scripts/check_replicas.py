@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import uuid
+
+REACHABLE_REPLICAS = ("replica-0", "replica-2")
+
+
+def insert_marker(path: str, marker: str):
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "INSERT INTO addresses (id, address) VALUES (?, ?)",
+            (uuid.uuid4().hex, marker),
+        )
+
+
+async def check(directory: str, reads: int):
+    import httpx
+
+    from database import replicas
+    from main import app
+
+    primary = os.path.join(directory, "primary.db")
+    for name in REACHABLE_REPLICAS:
+        shutil.copyfile(primary, os.path.join(directory, f"{name}.db"))
+        insert_marker(os.path.join(directory, f"{name}.db"), name)
+    insert_marker(primary, "primary")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://replicas"
+    ) as client:
+        served_by = []
+        for _ in range(reads):
+            page = (await client.get("/adresses/")).json()
+            served_by.append(page["items"][0]["address"])
+
+        await client.post(
+            "/auth/",
+            json={
+                "name": "replicas",
+                "email": "replicas@example.com",
+                "username": "replicas",
+                "password": "replicas-password",
+                "phone": "0",
+                "role": "agent",
+            },
+        )
+        token = (
+            await client.post(
+                "/auth/token",
+                data={"username": "replicas", "password": "replicas-password"},
+            )
+        ).json()["access_token"]
+        created = await client.post(
+            "/adresses/",
+            json={"state_id": None, "city_id": None, "address": "written"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        with sqlite3.connect(primary) as connection:
+            on_primary = connection.execute(
+                "SELECT count(*) FROM addresses WHERE address = 'written'"
+            ).fetchone()[0]
+        lagged = await client.get("/adresses/")
+        health = (await client.get("/health/db")).json()
+
+    return {
+        "served_by": served_by,
+        "write_status": created.status_code,
+        "write_on_primary": bool(on_primary),
+        "write_visible_on_replica": "written"
+        in [item["address"] for item in lagged.json()["items"]],
+        "replicas": replicas.status(),
+        "health": health["replicas"],
+    }
+
+
+def run_parent(args):
+    with tempfile.TemporaryDirectory() as directory:
+        replica_urls = [
+            f"sqlite:///{os.path.join(directory, 'replica-0.db')}",
+            f"sqlite:///{os.path.join(directory, 'missing', 'replica-1.db')}",
+            f"sqlite:///{os.path.join(directory, 'replica-2.db')}",
+        ]
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(directory, 'primary.db')}",
+            DATABASE_REPLICA_URLS=",".join(replica_urls),
+            JOB_APP_WORKERS="0",
+            STATS_REBUILD_INTERVAL="0",
+        )
+        env.setdefault("SECRET_KEY", "replicas-secret")
+        env.setdefault("ALGORITHM", "HS256")
+        env.pop("ASYNC_DATABASE_URL", None)
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "scripts.check_replicas",
+                "--child",
+                "--directory",
+                directory,
+                "--reads",
+                str(args.reads),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    print(f"Reads served by: {', '.join(result['served_by'])}")
+    print(
+        f"Write status {result['write_status']}, on primary: "
+        f"{result['write_on_primary']}, visible on replica: "
+        f"{result['write_visible_on_replica']}"
+    )
+    for name, replica_status in result["replicas"].items():
+        print(
+            f"{name}: healthy={replica_status['healthy']} "
+            f"retry_in={replica_status['retry_in']}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Show GET requests spread over read replicas, skipping an "
+        "unreachable one, while writes stay on the primary"
+    )
+    parser.add_argument("--reads", type=int, default=6)
+    parser.add_argument("--directory")
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(check(args.directory, args.reads))))
+    else:
+        run_parent(args)
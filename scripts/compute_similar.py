@@ -0,0 +1,20 @@
+import argparse
+import time
+
+import similarity
+from database import SessionLocal
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute top-K similar properties for the whole catalog"
+    )
+    parser.add_argument("--top-k", type=int, default=similarity.SIMILAR_TOP_K)
+    parser.add_argument("--block-size", type=int, default=similarity.SIMILAR_BLOCK_SIZE)
+    parser.add_argument("--workers", type=int, default=similarity.SIMILAR_WORKERS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        count = similarity.rebuild_all(db, args.top_k, args.block_size, args.workers)
+    print(f"Computed similar properties for {count} listings")
+    print(f"Elapsed: {time.perf_counter() - start:.2f}s")
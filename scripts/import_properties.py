@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import json
+import time
+
+import bulk
+import similarity
+from config import ImportFormat, ImportStatus
+from database import AsyncSessionLocal
+from models import ImportJobs
+from utils import convert_to_uuid
+
+
+async def run_import(args) -> dict:
+    async with AsyncSessionLocal() as db:
+        if args.job_id:
+            job = await db.get(ImportJobs, convert_to_uuid(args.job_id))
+            if job is None:
+                raise SystemExit(f"Import {args.job_id} not found")
+        else:
+            job = ImportJobs(
+                agent_id=convert_to_uuid(args.agent_id),
+                format=args.format or bulk.detect_format(args.path, None),
+            )
+            db.add(job)
+            await db.commit()
+
+        with open(args.path, "rb") as binary_file:
+            await bulk.import_file(db, job, binary_file, args.batch_size)
+        return bulk.job_summary(job)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import properties")
+    parser.add_argument("path")
+    parser.add_argument("--agent-id", help="Required unless --job-id is given")
+    parser.add_argument("--format", type=ImportFormat, choices=list(ImportFormat))
+    parser.add_argument("--job-id", help="Resume a previous import")
+    parser.add_argument("--batch-size", type=int, default=bulk.BULK_BATCH_SIZE)
+    parser.add_argument("--skip-similarity", action="store_true")
+    args = parser.parse_args()
+    if not args.job_id and not args.agent_id:
+        parser.error("--agent-id is required when not resuming with --job-id")
+
+    start = time.perf_counter()
+    summary = asyncio.run(run_import(args))
+    elapsed = time.perf_counter() - start
+    if not args.skip_similarity:
+        similarity.rebuild_in_background()
+    print(json.dumps(summary, default=str, indent=2))
+    print(
+        f"Processed {summary['rows_processed']} rows in {elapsed:.2f}s "
+        f"({summary['rows_processed'] / max(elapsed, 1e-9):.0f} rows/s)"
+    )
+    if summary["status"] == ImportStatus.FALLIDA:
+        raise SystemExit(1)
@@ -0,0 +1,17 @@
+import asyncio
+import time
+
+import stats
+from database import AsyncSessionLocal
+
+
+async def main() -> int:
+    async with AsyncSessionLocal() as db:
+        return await stats.rebuild(db)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    groups = asyncio.run(main())
+    print(f"Rebuilt market statistics for {groups} groups")
+    print(f"Elapsed: {time.perf_counter() - start:.2f}s")
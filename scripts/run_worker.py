@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+
+import jobs
+
+
+async def run_workers(concurrency: int, kinds: list | None):
+    await asyncio.gather(*(jobs.work(kinds=kinds) for _ in range(concurrency)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--kinds", nargs="+", choices=sorted(jobs.HANDLERS), help="Only run these kinds"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_workers(args.concurrency, args.kinds))
+    except KeyboardInterrupt:
+        pass
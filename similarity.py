@@ -0,0 +1,357 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import delete, func, insert, or_, select
+
+from config import PropertiesType
+from database import SessionLocal
+from models import PropertieAssignedOptions, Properties, SimilarProperties
+
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "10"))
+SIMILAR_BLOCK_SIZE = int(os.getenv("SIMILAR_BLOCK_SIZE", "1024"))
+SIMILAR_TILE_SIZE = int(os.getenv("SIMILAR_TILE_SIZE", "16384"))
+SIMILAR_WORKERS = int(os.getenv("SIMILAR_WORKERS", os.cpu_count() or 1))
+SIMILAR_CACHE_SECONDS = float(os.getenv("SIMILAR_CACHE_SECONDS", "600"))
+
+TYPE_WEIGHT = 2.0
+LOCATION_WEIGHT = 1.5
+OPTIONS_WEIGHT = 0.5
+PROPERTY_TYPES = list(PropertiesType)
+
+
+def select_rows(db, property_ids=None) -> list:
+    statement = select(
+        Properties.id,
+        Properties.type,
+        Properties.price,
+        Properties.size,
+        Properties.bedrooms,
+        Properties.bathrooms,
+        Properties.latitude,
+        Properties.longitude,
+    ).order_by(Properties.id)
+    if property_ids is not None:
+        statement = statement.where(Properties.id.in_(property_ids))
+    return db.execute(statement).all()
+
+
+def select_options(db, property_ids=None) -> list:
+    statement = select(
+        PropertieAssignedOptions.property_id,
+        PropertieAssignedOptions.property_option_id,
+    )
+    if property_ids is not None:
+        statement = statement.where(
+            PropertieAssignedOptions.property_id.in_(property_ids)
+        )
+    return db.execute(statement).all()
+
+
+def numeric_values(rows: list) -> np.ndarray:
+    numeric = np.array(
+        [[row.price, row.size, row.bedrooms, row.bathrooms] for row in rows],
+        dtype=np.float64,
+    ).reshape(len(rows), 4)
+    numeric[:, :2] = np.log1p(np.maximum(numeric[:, :2], 0))
+    return numeric
+
+
+def standardization(numeric: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    std = numeric.std(axis=0)
+    return numeric.mean(axis=0), np.divide(
+        1, std, out=np.zeros_like(std), where=std != 0
+    )
+
+
+def build_features(
+    rows: list,
+    assigned: list,
+    option_index: dict,
+    mean: np.ndarray,
+    scale: np.ndarray,
+) -> np.ndarray:
+    index = {row.id: position for position, row in enumerate(rows)}
+
+    types = np.zeros((len(rows), len(PROPERTY_TYPES)), dtype=np.float32)
+    types[
+        np.arange(len(rows)),
+        [PROPERTY_TYPES.index(PropertiesType(row.type)) for row in rows],
+    ] = TYPE_WEIGHT
+
+    numeric = (numeric_values(rows) - mean) * scale
+
+    location = np.zeros((len(rows), 3), dtype=np.float64)
+    for position, row in enumerate(rows):
+        if row.latitude is not None and row.longitude is not None:
+            latitude, longitude = np.radians(row.latitude), np.radians(row.longitude)
+            location[position] = (
+                np.cos(latitude) * np.cos(longitude),
+                np.cos(latitude) * np.sin(longitude),
+                np.sin(latitude),
+            )
+    location *= LOCATION_WEIGHT
+
+    options = np.zeros((len(rows), len(option_index)), dtype=np.float32)
+    for property_id, option_id in assigned:
+        if property_id in index and option_id in option_index:
+            options[index[property_id], option_index[option_id]] = OPTIONS_WEIGHT
+
+    features = np.hstack([types, numeric, location, options]).astype(np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return features / norms
+
+
+class FeatureCache:
+    def __init__(self, max_age: float = SIMILAR_CACHE_SECONDS):
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.loaded_at = None
+        self.ids = []
+        self.index = {}
+        self.features = np.zeros((0, 0), dtype=np.float32)
+        self.option_index = {}
+        self.mean = self.scale = None
+
+    def snapshot(self) -> tuple[list, dict, np.ndarray]:
+        return self.ids, self.index, self.features
+
+    def load(self, db) -> tuple[list, dict, np.ndarray]:
+        with self.lock:
+            rows = select_rows(db)
+            assigned = select_options(db)
+            option_ids = sorted({option_id for _, option_id in assigned if option_id})
+            self.option_index = {
+                option_id: position for position, option_id in enumerate(option_ids)
+            }
+            self.mean, self.scale = standardization(numeric_values(rows))
+            self.ids = [row.id for row in rows]
+            self.index = {
+                property_id: position for position, property_id in enumerate(self.ids)
+            }
+            self.features = (
+                build_features(rows, assigned, self.option_index, self.mean, self.scale)
+                if rows
+                else np.zeros((0, 0), dtype=np.float32)
+            )
+            self.loaded_at = time.monotonic()
+            return self.snapshot()
+
+    def expired(self) -> bool:
+        return (
+            self.loaded_at is None
+            or not self.ids
+            or time.monotonic() - self.loaded_at > self.max_age
+        )
+
+    def refresh(self, db, property_ids) -> tuple[list, dict, np.ndarray]:
+        if self.expired():
+            return self.load(db)
+        with self.lock:
+            cached = set(self.index)
+            property_ids = set(property_ids)
+            rows = select_rows(db, property_ids)
+            found = {row.id for row in rows}
+            expected = len(cached | found) - len(cached & (property_ids - found))
+            if db.scalar(select(func.count()).select_from(Properties)) != expected:
+                missing = set(db.scalars(select(Properties.id))) ^ cached
+                missing -= property_ids
+                property_ids |= missing
+                rows += select_rows(db, missing)
+            assigned = select_options(db, property_ids)
+            if all(
+                option_id in self.option_index for _, option_id in assigned if option_id
+            ):
+                self.apply(
+                    property_ids,
+                    rows,
+                    build_features(
+                        rows, assigned, self.option_index, self.mean, self.scale
+                    ),
+                )
+                return self.snapshot()
+        return self.load(db)
+
+    def apply(self, property_ids: set, rows: list, features: np.ndarray):
+        found = {row.id: position for position, row in enumerate(rows)}
+        keep = [
+            position
+            for position, property_id in enumerate(self.ids)
+            if property_id not in property_ids or property_id in found
+        ]
+        ids = [self.ids[position] for position in keep]
+        matrix = self.features[keep]
+        added = [row.id for row in rows if row.id not in self.index]
+        matrix = np.vstack([matrix, features[[found[row] for row in added]]])
+        ids.extend(added)
+        index = {property_id: position for position, property_id in enumerate(ids)}
+        for property_id, position in found.items():
+            matrix[index[property_id]] = features[position]
+        self.ids, self.index, self.features = ids, index, matrix
+
+
+feature_cache = FeatureCache()
+
+
+def load_features(db) -> tuple[list, np.ndarray]:
+    ids, _, features = feature_cache.load(db)
+    return ids, features
+
+
+def largest(scores: np.ndarray, k: int) -> np.ndarray:
+    if scores.shape[1] <= k:
+        return np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    return np.argpartition(scores, -k, axis=1)[:, -k:]
+
+
+def top_k(
+    query: np.ndarray,
+    features: np.ndarray,
+    positions: np.ndarray,
+    k: int,
+    tile_size: int = SIMILAR_TILE_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    k = min(k, features.shape[0] - 1)
+    if k <= 0:
+        empty = np.zeros((len(positions), 0))
+        return empty.astype(np.int64), empty
+    rows = np.arange(len(positions))
+    best = np.zeros((len(positions), 0), dtype=np.int64)
+    best_scores = np.zeros((len(positions), 0), dtype=np.float32)
+    for start in range(0, features.shape[0], tile_size):
+        scores = query @ features[start : start + tile_size].T
+        own = (positions >= start) & (positions < start + scores.shape[1])
+        scores[rows[own], positions[own] - start] = -np.inf
+        candidates = largest(scores, k)
+        best = np.hstack([best, candidates + start])
+        best_scores = np.hstack(
+            [best_scores, np.take_along_axis(scores, candidates, axis=1)]
+        )
+        del scores
+        keep = largest(best_scores, k)
+        best = np.take_along_axis(best, keep, axis=1)
+        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    return (
+        np.take_along_axis(best, order, axis=1),
+        np.take_along_axis(best_scores, order, axis=1),
+    )
+
+
+def compute_rows(
+    features: np.ndarray,
+    positions: np.ndarray,
+    k: int = SIMILAR_TOP_K,
+    block_size: int = SIMILAR_BLOCK_SIZE,
+    workers: int = SIMILAR_WORKERS,
+):
+    blocks = [
+        positions[start : start + block_size]
+        for start in range(0, len(positions), block_size)
+    ]
+
+    def run(block):
+        return block, *top_k(features[block], features, block, k)
+
+    if workers > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(run, blocks)
+    else:
+        yield from map(run, blocks)
+
+
+def store_rows(db, ids: list, block, neighbors, scores):
+    block_ids = [ids[position] for position in block]
+    db.execute(
+        delete(SimilarProperties).where(SimilarProperties.property_id.in_(block_ids))
+    )
+    values = [
+        {
+            "property_id": property_id,
+            "similar_property_id": ids[neighbor],
+            "score": float(score),
+            "rank": rank,
+        }
+        for property_id, row_neighbors, row_scores in zip(block_ids, neighbors, scores)
+        for rank, (neighbor, score) in enumerate(zip(row_neighbors, row_scores), 1)
+    ]
+    if values:
+        db.execute(insert(SimilarProperties), values)
+
+
+def rebuild_all(
+    db,
+    k: int = SIMILAR_TOP_K,
+    block_size: int = SIMILAR_BLOCK_SIZE,
+    workers: int = SIMILAR_WORKERS,
+) -> int:
+    ids, features = load_features(db)
+    for block, neighbors, scores in compute_rows(
+        features, np.arange(len(ids)), k, block_size, workers
+    ):
+        store_rows(db, ids, block, neighbors, scores)
+        db.commit()
+    return len(ids)
+
+
+def refresh_properties(
+    db, property_ids, k: int = SIMILAR_TOP_K, include_neighbors: bool = True
+):
+    ids, index, features = feature_cache.refresh(db, property_ids)
+    changed = [property_id for property_id in property_ids if property_id in index]
+    if not changed:
+        return
+
+    affected = set(changed)
+    if include_neighbors:
+        affected.update(
+            db.scalars(
+                select(SimilarProperties.property_id).where(
+                    SimilarProperties.similar_property_id.in_(changed)
+                )
+            )
+        )
+        positions = np.array([index[property_id] for property_id in changed])
+        neighbors, _ = top_k(features[positions], features, positions, k)
+        affected.update(ids[neighbor] for neighbor in neighbors.ravel())
+
+    positions = np.array(
+        sorted(index[property_id] for property_id in affected if property_id in index)
+    )
+    for block, neighbors, scores in compute_rows(features, positions, k, workers=1):
+        store_rows(db, ids, block, neighbors, scores)
+    db.commit()
+
+
+async def detach_properties(db, property_ids) -> list:
+    if not property_ids:
+        return []
+    referrers = (
+        await db.scalars(
+            select(SimilarProperties.property_id).where(
+                SimilarProperties.similar_property_id.in_(property_ids)
+            )
+        )
+    ).all()
+    await db.execute(
+        delete(SimilarProperties).where(
+            or_(
+                SimilarProperties.property_id.in_(property_ids),
+                SimilarProperties.similar_property_id.in_(property_ids),
+            )
+        )
+    )
+    return list(set(referrers) - set(property_ids))
+
+
+def refresh_in_background(property_ids, include_neighbors: bool = True):
+    with SessionLocal() as db:
+        refresh_properties(db, property_ids, include_neighbors=include_neighbors)
+
+
+def rebuild_in_background():
+    with SessionLocal() as db:
+        rebuild_all(db)
@@ -0,0 +1,248 @@
+import math
+import os
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from config import StatsGroupBy
+from database import AsyncSessionLocal
+from models import Addresses, Properties, PropertyPriceHistogram, PropertyStats
+from pagination import STREAM_CHUNK_SIZE
+
+STATS_BUCKET_WIDTH = float(os.getenv("STATS_BUCKET_WIDTH", "0.01"))
+STATS_REBUILD_INTERVAL = int(os.getenv("STATS_REBUILD_INTERVAL", "3600"))
+
+SUM_COLUMNS = [
+    "count",
+    "price_sum",
+    "size_sum",
+    "price_per_m2_sum",
+    "price_per_m2_count",
+]
+GROUP_COLUMNS = {
+    StatsGroupBy.ESTADO: "state_id",
+    StatsGroupBy.CIUDAD: "city_id",
+    StatsGroupBy.TIPO: "type",
+    StatsGroupBy.ESTATUS: "status",
+}
+
+SNAPSHOT_COLUMNS = (
+    Addresses.state_id,
+    Addresses.city_id,
+    Properties.type,
+    Properties.status,
+    Properties.price,
+    Properties.size,
+)
+
+
+def snapshot_statement():
+    return select(*SNAPSHOT_COLUMNS).outerjoin(
+        Addresses, Properties.address_id == Addresses.id
+    )
+
+
+def price_bucket(price: float) -> int:
+    return math.floor(math.log(max(price, 1.0)) / math.log1p(STATS_BUCKET_WIDTH))
+
+
+def bucket_price(bucket: int) -> float:
+    return math.exp((bucket + 0.5) * math.log1p(STATS_BUCKET_WIDTH))
+
+
+def group_key(state_id, city_id, property_type, property_status) -> str:
+    return ":".join(
+        [
+            str(state_id or ""),
+            str(city_id or ""),
+            property_type.value,
+            property_status.value,
+        ]
+    )
+
+
+def accumulate(groups: dict, rows, sign: int = 1) -> dict:
+    for state_id, city_id, property_type, property_status, price, size in rows:
+        key = group_key(state_id, city_id, property_type, property_status)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "group_key": key,
+                "state_id": state_id,
+                "city_id": city_id,
+                "type": property_type,
+                "status": property_status,
+                **{column: 0 for column in SUM_COLUMNS},
+                "buckets": Counter(),
+            }
+        group["count"] += sign
+        group["price_sum"] += sign * price
+        group["size_sum"] += sign * size
+        if size > 0:
+            group["price_per_m2_sum"] += sign * price / size
+            group["price_per_m2_count"] += sign
+        group["buckets"][price_bucket(price)] += sign
+    return groups
+
+
+def upsert(dialect_name: str, model, index_elements: list, increments: list):
+    dialect_insert = (
+        postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    )
+    statement = dialect_insert(model)
+    values = {
+        column: getattr(model, column) + statement.excluded[column]
+        for column in increments
+    }
+    if hasattr(model, "updated_at"):
+        values["updated_at"] = datetime.now(timezone.utc)
+    return statement.on_conflict_do_update(index_elements=index_elements, set_=values)
+
+
+async def snapshot(db, property_ids) -> list:
+    if not property_ids:
+        return []
+    return (
+        await db.execute(snapshot_statement().where(Properties.id.in_(property_ids)))
+    ).all()
+
+
+async def record_changes(db, before: list, after: list):
+    groups = accumulate(accumulate({}, before, -1), after)
+    stats_rows, bucket_rows = [], []
+    for group in groups.values():
+        buckets = group.pop("buckets")
+        if any(group[column] for column in SUM_COLUMNS):
+            stats_rows.append(group)
+        bucket_rows.extend(
+            {"group_key": group["group_key"], "bucket": bucket, "count": count}
+            for bucket, count in buckets.items()
+            if count
+        )
+    if not stats_rows and not bucket_rows:
+        return
+
+    dialect_name = db.get_bind().dialect.name
+    touched = list(groups)
+    if stats_rows:
+        await db.execute(
+            upsert(dialect_name, PropertyStats, ["group_key"], SUM_COLUMNS),
+            stats_rows,
+        )
+    if bucket_rows:
+        await db.execute(
+            upsert(
+                dialect_name,
+                PropertyPriceHistogram,
+                ["group_key", "bucket"],
+                ["count"],
+            ),
+            bucket_rows,
+        )
+    await db.execute(
+        delete(PropertyPriceHistogram).where(
+            PropertyPriceHistogram.group_key.in_(touched),
+            PropertyPriceHistogram.count <= 0,
+        )
+    )
+    empty = select(PropertyStats.group_key).where(
+        PropertyStats.group_key.in_(touched), PropertyStats.count <= 0
+    )
+    await db.execute(
+        delete(PropertyPriceHistogram).where(
+            PropertyPriceHistogram.group_key.in_(empty)
+        )
+    )
+    await db.execute(delete(PropertyStats).where(PropertyStats.group_key.in_(empty)))
+
+
+async def lock_tables(db):
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(
+            text(
+                f"LOCK TABLE {PropertyStats.__tablename__}, "
+                f"{PropertyPriceHistogram.__tablename__} IN EXCLUSIVE MODE"
+            )
+        )
+
+
+async def rebuild(db) -> int:
+    await lock_tables(db)
+    await db.execute(delete(PropertyPriceHistogram))
+    await db.execute(delete(PropertyStats))
+    groups = {}
+    result = await db.stream(
+        snapshot_statement().execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    async for partition in result.partitions():
+        accumulate(groups, partition)
+
+    bucket_rows = [
+        {"group_key": group["group_key"], "bucket": bucket, "count": count}
+        for group in groups.values()
+        for bucket, count in group.pop("buckets").items()
+    ]
+    if groups:
+        await db.execute(insert(PropertyStats), list(groups.values()))
+        await db.execute(insert(PropertyPriceHistogram), bucket_rows)
+    await db.commit()
+    return len(groups)
+
+
+async def rebuild_in_background():
+    async with AsyncSessionLocal() as db:
+        await rebuild(db)
+
+
+def median_price(buckets: Counter) -> float | None:
+    total = sum(buckets.values())
+    if total <= 0:
+        return None
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += buckets[bucket]
+        if seen * 2 >= total:
+            return round(bucket_price(bucket), 2)
+
+
+def summarize(stats_rows, bucket_rows, group_by: list) -> list[dict]:
+    bucket_rows_by_key = {}
+    for key, bucket, count in bucket_rows:
+        bucket_rows_by_key.setdefault(key, []).append((bucket, count))
+
+    summaries = {}
+    for row in stats_rows:
+        dimensions = tuple(getattr(row, GROUP_COLUMNS[column]) for column in group_by)
+        summary = summaries.get(dimensions)
+        if summary is None:
+            summary = summaries[dimensions] = {
+                **{column.value: value for column, value in zip(group_by, dimensions)},
+                **{column: 0 for column in SUM_COLUMNS},
+                "buckets": Counter(),
+            }
+        for column in SUM_COLUMNS:
+            summary[column] += getattr(row, column)
+        for bucket, count in bucket_rows_by_key.get(row.group_key, []):
+            summary["buckets"][bucket] += count
+
+    results = []
+    for summary in summaries.values():
+        count = summary.pop("count")
+        per_m2_count = summary.pop("price_per_m2_count")
+        results.append(
+            {
+                **{column.value: summary[column.value] for column in group_by},
+                "count": count,
+                "avg_price": round(summary["price_sum"] / count, 2) if count else None,
+                "median_price": median_price(summary["buckets"]),
+                "avg_size": round(summary["size_sum"] / count, 2) if count else None,
+                "avg_price_per_m2": (
+                    round(summary["price_per_m2_sum"] / per_m2_count, 2)
+                    if per_m2_count
+                    else None
+                ),
+            }
+        )
+    return sorted(results, key=lambda result: -result["count"])
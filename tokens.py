@@ -0,0 +1,134 @@
+import hashlib
+import os
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from dotenv import load_dotenv
+from jose import JWTError, jwk, jwt
+
+from cache import MemoryBackend
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM")
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "20"))
+REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", "14"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+EC_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+
+
+class SigningKey:
+    def __init__(self, kid: str, algorithm: str, verify_key, sign_key=None):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.verify_key = verify_key
+        self.sign_key = sign_key
+
+
+def key_algorithm(public_key) -> str:
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        if public_key.curve.name not in EC_ALGORITHMS:
+            raise ValueError(f"Unsupported curve: {public_key.curve.name}")
+        return EC_ALGORITHMS[public_key.curve.name]
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    raise ValueError(f"Unsupported key type: {type(public_key).__name__}")
+
+
+def load_keys(directory: str) -> dict[str, SigningKey]:
+    keys = {}
+    for path in sorted(Path(directory).glob("*.pem")):
+        data = path.read_bytes()
+        if b"PRIVATE KEY" in data:
+            private_key = serialization.load_pem_private_key(data, password=None)
+            public_key = private_key.public_key()
+            sign_key = data.decode()
+        else:
+            public_key = serialization.load_pem_public_key(data)
+            sign_key = None
+        verify_key = public_key.public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        keys[path.stem] = SigningKey(
+            path.stem, key_algorithm(public_key), verify_key, sign_key
+        )
+    return keys
+
+
+if JWT_KEYS_DIR:
+    keys = load_keys(JWT_KEYS_DIR)
+    active_kid = JWT_ACTIVE_KID or max(
+        (kid for kid, key in keys.items() if key.sign_key is not None), default=None
+    )
+else:
+    keys = {"default": SigningKey("default", ALGORITHM, SECRET_KEY, SECRET_KEY)}
+    active_kid = "default"
+
+verified_claims = MemoryBackend(TOKEN_CACHE_SIZE)
+
+
+def create_access_token(claims: dict, expires_delta: timedelta | None = None) -> str:
+    key = keys[active_kid]
+    expires = datetime.now(timezone.utc) + (
+        expires_delta or timedelta(minutes=ACCESS_TOKEN_MINUTES)
+    )
+    return jwt.encode(
+        {**claims, "exp": expires},
+        key.sign_key,
+        algorithm=key.algorithm,
+        headers={"kid": key.kid},
+    )
+
+
+def decode_access_token(token: str, use_cache: bool = True) -> dict:
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    if use_cache:
+        claims = verified_claims.get(cache_key)
+        if claims is not None:
+            return claims
+
+    key = keys.get(jwt.get_unverified_header(token).get("kid") or active_kid)
+    if key is None:
+        raise JWTError("Unknown signing key")
+    claims = jwt.decode(token, key.verify_key, algorithms=[key.algorithm])
+
+    ttl = claims.get("exp", 0) - time.time()
+    if use_cache and ttl > 0:
+        verified_claims.set(cache_key, claims, ttl)
+    return claims
+
+
+def public_jwks() -> dict:
+    return {
+        "keys": [
+            {
+                **jwk.construct(key.verify_key, key.algorithm).to_dict(),
+                "kid": key.kid,
+                "use": "sig",
+            }
+            for key in keys.values()
+            if not key.algorithm.startswith("HS")
+        ]
+    }
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def new_refresh_token() -> tuple[str, str]:
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def refresh_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_DAYS)